@@ -1,7 +1,9 @@
 from flask import Flask
 from flask_cors import CORS
-from .config import Config
-from .database import db
+from .config import Config, basedir
+from .database import db, migrate
+from .limiter import limiter
+from .json_provider import ORJSONProvider
 from .routes import init_routes
 import logging
 import os
@@ -9,6 +11,7 @@ import os
 def create_app(config_class=Config):
     """Initialize and configure the Flask application."""
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     app.config.from_object(config_class)
 
     # Ensure the instance folder exists
@@ -17,6 +20,8 @@ def create_app(config_class=Config):
     # Initialize extensions
     CORS(app)
     db.init_app(app)
+    migrate.init_app(app, db, directory=os.path.join(basedir, 'migrations'))
+    limiter.init_app(app)
 
     # Setup logging
     logging.basicConfig(
@@ -27,8 +32,9 @@ def create_app(config_class=Config):
     # Initialize routes
     init_routes(app)
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Create database tables (otherwise done once via `flask init-db`)
+    if app.config.get('AUTO_CREATE_TABLES'):
+        with app.app_context():
+            db.create_all()
 
     return app
\ No newline at end of file
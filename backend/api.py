@@ -0,0 +1,30 @@
+from fastapi import FastAPI
+from fastapi.middleware.wsgi import WSGIMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from . import create_app
+from .config import Config
+from .database import create_async_db_engine
+
+def create_api(config_class=Config) -> FastAPI:
+    """Build the ASGI application: FastAPI book/payment routers plus the Flask app."""
+    from .routes.book_routes import router as book_router
+    from .routes.payment_routes import router as payment_router
+    from .utils.eth import prewarm_eth_handler
+    from .utils.ipfs import IPFSManager
+
+    api = FastAPI(title='BookMarket')
+
+    # The async routes use the same database as the Flask app for this config
+    async_engine = create_async_db_engine(config_class)
+    api.state.async_session = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    api.add_event_handler('shutdown', async_engine.dispose)
+
+    api.add_event_handler('startup', prewarm_eth_handler)
+    api.add_event_handler('shutdown', IPFSManager.close_http_session)
+    api.include_router(book_router, prefix='/api')
+    api.include_router(payment_router, prefix='/api/payments')
+
+    # Everything else (auth, CLI-managed setup) is still served by the Flask app
+    api.mount('/', WSGIMiddleware(create_app(config_class)))
+
+    return api
\ No newline at end of file
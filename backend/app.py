@@ -7,8 +7,11 @@ app = create_app(Config)
 @app.cli.command("init-db")
 def init_db():
     """Initialize the database."""
+    from flask_migrate import stamp
     from .database import db
     db.create_all()
+    # Tables match the models, so later upgrades start from the latest revision
+    stamp()
     print("Database initialized!")
 
 @app.cli.command("create-admin")
@@ -22,7 +25,7 @@ def create_admin():
         email=os.getenv('ADMIN_EMAIL', 'admin@example.com'),
         password=os.getenv('ADMIN_PASSWORD', 'changeme'),
         ethereum_address=os.getenv('ADMIN_ETH_ADDRESS'),
-        is_author=True
+        role='author'
     )
     
     db.session.add(admin)
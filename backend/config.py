@@ -1,49 +1,108 @@
 import os
 from datetime import timedelta
-from web3 import Web3
+from functools import lru_cache
 from pathlib import Path
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
 
 # Get the base directory of the project
 basedir = Path(__file__).parent.parent
 
+# Snapshot of the environment, read once at import
+_env = os.environ.copy()
+
+
+def _get(name, default=None):
+    """Read a variable from the environment snapshot."""
+    return _env.get(name, default)
+
+
+def _get_bool(name, default=False):
+    """Read a 'true'/'false' flag from the environment snapshot."""
+    value = _env.get(name)
+    if value is None:
+        return default
+    return value.lower() == 'true'
+
+
+# Connection pool settings for file-backed and server databases; the async
+# engine is built from the same SQLALCHEMY_ENGINE_OPTIONS (see database.py)
+_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800  # seconds
+}
+
+
+def _engine_options(database_uri, **options):
+    """Build SQLALCHEMY_ENGINE_OPTIONS, adding SQLite-only connect args when needed."""
+    if database_uri and database_uri.startswith('sqlite'):
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+
+@lru_cache(maxsize=4)
+def load_contract_artifact(path: str) -> dict:
+    """Parse a contract build artifact once per path, keeping only the ABI, bytecode and networks."""
+    import orjson
+    with open(path, 'rb') as f:
+        artifact = orjson.loads(f.read())
+    # Source maps and ASTs make up most of the artifact; don't keep them around
+    return {
+        'abi': artifact.get('abi'),
+        'bytecode': artifact.get('bytecode'),
+        'networks': artifact.get('networks', {})
+    }
+
+
 class Config:
     """Base configuration."""
     
     # Flask
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
-    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    SECRET_KEY = _get('SECRET_KEY', 'your-secret-key-here')
+    DEBUG = _get_bool('FLASK_DEBUG', False)
     
     # Database - SQLite Configuration
-    SQLALCHEMY_DATABASE_URI = os.getenv(
+    SQLALCHEMY_DATABASE_URI = _get(
         'DATABASE_URL',
         f'sqlite:///{os.path.join(basedir, "bookmarket.db")}'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI, **_POOL_OPTIONS)
+    AUTO_CREATE_TABLES = _get_bool('AUTO_CREATE_TABLES', False)
     
     # JWT Configuration
-    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key')
+    JWT_SECRET_KEY = _get('JWT_SECRET_KEY', 'your-jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+
+    # Rate limiting (per client IP)
+    RATELIMIT_STORAGE_URI = _get('RATELIMIT_STORAGE_URI', 'memory://')
+    LOGIN_RATE_LIMIT = _get('LOGIN_RATE_LIMIT', '10 per minute')
     
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
-    ALLOWED_EXTENSIONS = {'pdf', 'epub'}
+    ALLOWED_EXTENSIONS = frozenset(('pdf', 'epub'))
     
     # IPFS Desktop Configuration
     IPFS_CONFIG = {
-        'API_HOST': os.getenv('IPFS_API_HOST', '/ip4/127.0.0.1/tcp/5001'),
-        'GATEWAY_HOST': os.getenv('IPFS_GATEWAY_HOST', 'http://127.0.0.1:8080'),
-        'GATEWAY_PUBLIC': os.getenv('IPFS_GATEWAY_PUBLIC', 'https://ipfs.io/ipfs'),
+        'API_URL': _get('IPFS_API_URL', 'http://127.0.0.1:5001'),
+        'GATEWAY_HOST': _get('IPFS_GATEWAY_HOST', 'http://127.0.0.1:8080'),
+        'GATEWAY_PUBLIC': _get('IPFS_GATEWAY_PUBLIC', 'https://ipfs.io/ipfs'),
         'CONNECT_TIMEOUT': 10,  # seconds
         'PIN_TIMEOUT': 30,  # seconds for pinning files
         'MAX_FILE_SIZE': 50 * 1024 * 1024,  # 50MB max file size for IPFS
-        'CHUNK_SIZE': 1024 * 1024  # 1MB chunks for uploading
+        'CHUNK_SIZE': 1024 * 1024,  # 1MB chunks for uploading
+        # Signed download links, verified by the gateway in front of IPFS
+        'DOWNLOAD_GATEWAY': _get('IPFS_DOWNLOAD_GATEWAY', 'http://127.0.0.1:8080/ipfs'),
+        'DOWNLOAD_SIGNING_KEY': _get('IPFS_DOWNLOAD_SIGNING_KEY', SECRET_KEY),
+        'DOWNLOAD_URL_TTL': 300  # seconds
     }
     
     # Ganache Configuration
     GANACHE_CONFIG = {
-        'PROVIDER_URI': os.getenv('WEB3_PROVIDER_URI', 'http://127.0.0.1:7545'),
+        'PROVIDER_URI': _get('WEB3_PROVIDER_URI', 'http://127.0.0.1:7545'),
         'CHAIN_ID': 1337,
         'NETWORK_ID': '5777',
         'GAS_LIMIT': 6721975,
@@ -53,47 +112,65 @@ class Config:
         'DEFAULT_BALANCE_ETHER': 1000
     }
     
-    # Web3 Provider Setup
-    WEB3_PROVIDER = Web3(Web3.HTTPProvider(GANACHE_CONFIG['PROVIDER_URI']))
+    # Web3 Provider Setup (created lazily, see get_web3_provider)
+    VERIFY_WEB3_ON_BOOT = _get_bool('VERIFY_WEB3_ON_BOOT', False)
     
     # Smart Contract Configuration
     CONTRACT_CONFIG = {
-        'ADDRESS': os.getenv('CONTRACT_ADDRESS'),
+        'ADDRESS': _get('CONTRACT_ADDRESS'),
         'ABI_PATH': os.path.join(basedir, 'smart_contracts/build/contracts/BookMarket.json'),
         'GAS_LIMIT': 3000000,
         'GAS_PRICE_STRATEGY': 'medium',
         'CONFIRMATIONS_NEEDED': 1,
-        'DEPLOYMENT_TIMEOUT': 60  # seconds
+        'DEPLOYMENT_TIMEOUT': float(_get('DEPLOYMENT_TIMEOUT', 60))  # seconds
     }
     
     # Cache Configuration
-    CACHE_TYPE = 'simple'
-    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_REDIS_URL = _get('CACHE_REDIS_URL')  # Book page cache shared across workers (SharedCache)
     
-    @staticmethod
-    def init_app(app):
+    @classmethod
+    def get_web3_provider(cls):
+        """Return the Web3 provider, creating it on first use."""
+        provider = cls.__dict__.get('_web3_provider')
+        if provider is None:
+            from .web3_config import create_web3_provider
+            provider = create_web3_provider(cls.GANACHE_CONFIG['PROVIDER_URI'])
+            cls._web3_provider = provider
+        return provider
+
+    # Exposed through app.config so callers never import web3 at module level
+    WEB3_PROVIDER_FACTORY = get_web3_provider
+
+    @classmethod
+    def contract_artifact(cls) -> dict:
+        """Return the ABI, bytecode and deployed addresses of the configured contract."""
+        return load_contract_artifact(cls.CONTRACT_CONFIG['ABI_PATH'])
+
+    @classmethod
+    def init_app(cls, app):
         """Initialize application configuration."""
         # Create upload folder if it doesn't exist
-        if not os.path.exists(Config.UPLOAD_FOLDER):
-            os.makedirs(Config.UPLOAD_FOLDER)
+        os.makedirs(cls.UPLOAD_FOLDER, exist_ok=True)
         
-        # Initialize Web3 and verify connection
-        if not Config.WEB3_PROVIDER.is_connected():
-            raise Exception("Unable to connect to Ethereum network")
-        
-        # Verify network is Ganache
-        network_id = Config.WEB3_PROVIDER.net.version
-        if network_id != Config.GANACHE_CONFIG['NETWORK_ID']:
-            raise Exception(f"Connected to wrong network. Expected Ganache (ID: {Config.GANACHE_CONFIG['NETWORK_ID']}), got {network_id}")
+        # Web3 is otherwise verified lazily on the first request that needs it
+        if app.config.get('VERIFY_WEB3_ON_BOOT', cls.VERIFY_WEB3_ON_BOOT):
+            from .utils.eth import verify_web3
+            if not verify_web3(app):
+                raise Exception("Unable to connect to Ganache network")
 
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = os.getenv(
+    SQLALCHEMY_DATABASE_URI = _get(
         'DEV_DATABASE_URL',
         f'sqlite:///{os.path.join(basedir, "bookmarket_dev.db")}'
     )
+    AUTO_CREATE_TABLES = _get_bool('AUTO_CREATE_TABLES', True)
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        poolclass=SingletonThreadPool  # One SQLite connection per thread
+    )
     SQLALCHEMY_ECHO = True
     
     # Override IPFS settings for development
@@ -107,10 +184,16 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = os.getenv(
+    SQLALCHEMY_DATABASE_URI = _get(
         'TEST_DATABASE_URL',
         f'sqlite:///{os.path.join(basedir, "bookmarket_test.db")}'
     )
+    AUTO_CREATE_TABLES = True
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(
+        SQLALCHEMY_DATABASE_URI,
+        poolclass=StaticPool  # Single shared connection for tests
+    )
+    RATELIMIT_ENABLED = False
     
     # Test-specific Ganache settings
     GANACHE_CONFIG = {
@@ -131,7 +214,8 @@ class TestingConfig(Config):
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    SQLALCHEMY_DATABASE_URI = _get('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI, **_POOL_OPTIONS)
     
     # Production-specific Ganache settings
     GANACHE_CONFIG = {
@@ -143,14 +227,14 @@ class ProductionConfig(Config):
     # Production-specific IPFS settings
     IPFS_CONFIG = {
         **Config.IPFS_CONFIG,
-        'GATEWAY_PUBLIC': os.getenv('IPFS_GATEWAY_PUBLIC', 'https://ipfs.io/ipfs'),
+        'GATEWAY_PUBLIC': _get('IPFS_GATEWAY_PUBLIC', 'https://ipfs.io/ipfs'),
         'PIN_TIMEOUT': 120,  # Longer timeout for production
         'CONNECT_TIMEOUT': 30  # Longer connection timeout for production
     }
 
     @classmethod
     def init_app(cls, app):
-        Config.init_app(app)
+        super().init_app(app)
         
         # Production logging configuration
         import logging
@@ -1,3 +1,67 @@
+from decimal import Decimal
+
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import BigInteger, Numeric
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+db = SQLAlchemy()
+migrate = Migrate()
+
+class Wei(TypeDecorator):
+    """
+    Unbounded wei amount as a Python int, stored as NUMERIC(78, 0) (room for any uint256).
+    SQLite has no exact type wider than 64 bits, so there it stays INTEGER and
+    overflows loudly instead of rounding through a float.
+    """
+
+    impl = Numeric(78, 0)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(BigInteger())
+        return dialect.type_descriptor(Numeric(78, 0))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == 'sqlite':
+            return value
+        return Decimal(int(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else int(value)
+
+# Async drivers for the database URL schemes we support
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg'
+}
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver."""
+    scheme, separator, rest = url.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+# Queue-pool sizing; the async SQLite driver uses NullPool (or StaticPool in tests) instead
+_QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+def async_engine_options(database_uri: str, options: dict) -> dict:
+    """Adapt a config's SQLALCHEMY_ENGINE_OPTIONS for the async engine."""
+    options = dict(options)
+    if database_uri.startswith('sqlite'):
+        # SingletonThreadPool is sync-only; StaticPool (tests) works with aiosqlite too
+        if options.get('poolclass') is not StaticPool:
+            options.pop('poolclass', None)
+        for key in _QUEUE_POOL_OPTIONS:
+            options.pop(key, None)
+    return options
 
-db = SQLAlchemy()
\ No newline at end of file
+def create_async_db_engine(config_class) -> AsyncEngine:
+    """Create the async (FastAPI) engine for the same database the Flask app uses."""
+    database_uri = config_class.SQLALCHEMY_DATABASE_URI
+    return create_async_engine(
+        async_database_url(database_uri),
+        **async_engine_options(database_uri, config_class.SQLALCHEMY_ENGINE_OPTIONS)
+    )
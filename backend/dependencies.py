@@ -0,0 +1,8 @@
+from fastapi import Request
+
+# FastAPI-only dependencies, kept out of database.py so the Flask app never imports FastAPI
+
+async def get_db(request: Request):
+    """Yield an AsyncSession from the app's session factory for the duration of a request."""
+    async with request.app.state.async_session() as session:
+        yield session
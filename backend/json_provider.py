@@ -0,0 +1,15 @@
+from flask.json.provider import JSONProvider
+import orjson
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (native datetime support)."""
+
+    option = orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
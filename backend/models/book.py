@@ -1,9 +1,14 @@
-from datetime import datetime
-from ..database import db
+from ..database import Wei, db
 from typing import List, Optional
 
 class Book(db.Model):
     __tablename__ = 'books'
+    __table_args__ = (
+        db.Index('ix_books_author_avail', 'author_id', 'is_available', 'is_deleted'),
+        db.Index('ix_books_created', 'created_at'),
+        # Keyset pagination over available books, scanned newest first
+        db.Index('ix_books_available_id', 'is_available', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -13,15 +18,20 @@ class Book(db.Model):
     ipfs_hash = db.Column(db.String(64), unique=True, nullable=False)
     cover_ipfs_hash = db.Column(db.String(64), nullable=True)
     blockchain_id = db.Column(db.Integer, unique=True, nullable=False)
-    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
     
     # Status flags
     is_available = db.Column(db.Boolean, default=True)
     is_deleted = db.Column(db.Boolean, default=False)
+
+    # Sales counters, maintained by the purchase flow
+    total_sales = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_revenue = db.Column(Wei, nullable=False, default=0, server_default='0')
     
     # Metadata
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now())
     
     # Categories and tags (JSON fields)
     categories = db.Column(db.JSON, default=list)
@@ -33,7 +43,8 @@ class Book(db.Model):
     def __init__(self, title: str, price: int, royalty_percentage: int, 
                  ipfs_hash: str, blockchain_id: int, author_id: int,
                  description: Optional[str] = None, cover_ipfs_hash: Optional[str] = None,
-                 categories: Optional[List[str]] = None, tags: Optional[List[str]] = None):
+                 categories: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+                 seller_id: Optional[int] = None):
         self.title = title
         self.description = description
         self.price = price
@@ -41,6 +52,7 @@ class Book(db.Model):
         self.ipfs_hash = ipfs_hash
         self.blockchain_id = blockchain_id
         self.author_id = author_id
+        self.seller_id = seller_id
         self.cover_ipfs_hash = cover_ipfs_hash
         self.categories = categories or []
         self.tags = tags or []
@@ -58,11 +70,14 @@ class Book(db.Model):
             'blockchain_id': self.blockchain_id,
             'author_id': self.author_id,
             'author_username': self.author.username,
+            'seller_id': self.seller_id,
             'is_available': self.is_available,
+            'total_sales': self.total_sales,
+            'total_revenue': self.total_revenue,
             'categories': self.categories,
             'tags': self.tags,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
     def __repr__(self) -> str:
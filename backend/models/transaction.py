@@ -1,4 +1,3 @@
-from datetime import datetime
 from ..database import db
 from enum import Enum
 
@@ -14,50 +13,58 @@ class TransactionStatus(Enum):
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_tx_buyer_type', 'buyer_id', 'type'),
+        db.Index('ix_tx_seller_status', 'seller_id', 'status'),
+        db.Index('ix_tx_book_status', 'book_id', 'status', 'id'),
+        db.Index('ix_tx_book_buyer_status', 'book_id', 'buyer_address', 'status'),
+        db.Index('ix_tx_author_status', 'author_id', 'status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     transaction_hash = db.Column(db.String(66), unique=True, nullable=False)
     book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=True)
-    buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
-    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    buyer_address = db.Column(db.String(42), nullable=True)  # Purchasing wallet
+    seller_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     amount = db.Column(db.BigInteger, nullable=False)  # Amount in wei
+
+    # Snapshot of the book's author and royalty at sale time (saves joining books)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    royalty_percentage = db.Column(db.Integer, nullable=True)  # 0-100
+    # Author's cut in wei, computed in Python: amount * percentage overflows BIGINT in SQL
+    royalty_amount = db.Column(db.BigInteger, nullable=True)
     
     # Transaction metadata
-    type = db.Column(db.Enum(TransactionType), nullable=False, default=TransactionType.PURCHASE)
-    status = db.Column(db.Enum(TransactionStatus), nullable=False, default=TransactionStatus.PENDING)
+    # Stored as the enum values; TransactionType/TransactionStatus validate them
+    type = db.Column(db.String(16), nullable=False, default=TransactionType.PURCHASE.value, index=True)
+    status = db.Column(db.String(16), nullable=False, default=TransactionStatus.PENDING.value, index=True)
     gas_used = db.Column(db.BigInteger, nullable=True)
     block_number = db.Column(db.Integer, nullable=True)
     
     # Timestamps
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    completed_at = db.Column(db.DateTime, nullable=True)
+    timestamp = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    completed_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
     def __init__(self, transaction_hash: str, seller_id: int, amount: int,
-                 buyer_id: int = None, book_id: int = None,
+                 buyer_id: int = None, book_id: int = None, buyer_address: str = None,
                  type: TransactionType = TransactionType.PURCHASE,
                  status: TransactionStatus = TransactionStatus.PENDING,
-                 gas_used: int = None, block_number: int = None):
+                 gas_used: int = None, block_number: int = None,
+                 author_id: int = None, royalty_percentage: int = None):
         self.transaction_hash = transaction_hash
         self.seller_id = seller_id
         self.amount = amount
         self.buyer_id = buyer_id
+        self.buyer_address = buyer_address
         self.book_id = book_id
-        self.type = type
-        self.status = status
+        self.type = TransactionType(type).value
+        self.status = TransactionStatus(status).value
         self.gas_used = gas_used
         self.block_number = block_number
-
-    def complete(self, gas_used: int, block_number: int) -> None:
-        """Mark transaction as completed."""
-        self.status = TransactionStatus.COMPLETED
-        self.gas_used = gas_used
-        self.block_number = block_number
-        self.completed_at = datetime.utcnow()
-
-    def fail(self) -> None:
-        """Mark transaction as failed."""
-        self.status = TransactionStatus.FAILED
-        self.completed_at = datetime.utcnow()
+        self.author_id = author_id
+        self.royalty_percentage = royalty_percentage
+        self.royalty_amount = amount * royalty_percentage // 100 if royalty_percentage is not None else None
 
     def to_dict(self) -> dict:
         """Convert transaction to dictionary."""
@@ -68,15 +75,16 @@ class Transaction(db.Model):
             'book_title': self.book.title if self.book else None,
             'buyer_id': self.buyer_id,
             'buyer_username': self.buyer.username if self.buyer else None,
+            'buyer_address': self.buyer_address,
             'seller_id': self.seller_id,
             'seller_username': self.seller.username,
             'amount': self.amount,
-            'type': self.type.value,
-            'status': self.status.value,
+            'type': self.type,
+            'status': self.status,
             'gas_used': self.gas_used,
             'block_number': self.block_number,
-            'timestamp': self.timestamp.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+            'timestamp': self.timestamp,
+            'completed_at': self.completed_at
         }
 
     def __repr__(self) -> str:
@@ -1,38 +1,67 @@
-from datetime import datetime
 from ..database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from typing import List
 
+# Shared argon2 hasher; work factors tuned for interactive logins
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+_dummy_password_hash = None
+
 class User(db.Model):
     __tablename__ = 'users'
 
+    ROLES = ('reader', 'author', 'seller')
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     ethereum_address = db.Column(db.String(42), unique=True, nullable=True)
-    is_author = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    role = db.Column(db.String(20), nullable=False, default='reader', server_default='reader')
+    is_author = db.Column(db.Boolean, default=False)  # Mirrors role == 'author'
+    created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), onupdate=db.func.now())
 
     # Relationships
-    books = db.relationship('Book', backref='author', lazy='dynamic')
+    books = db.relationship('Book', foreign_keys='Book.author_id', backref='author', lazy='dynamic')
+    listed_books = db.relationship('Book', foreign_keys='Book.seller_id', backref='seller', lazy='dynamic')
     purchases = db.relationship('Transaction', foreign_keys='Transaction.buyer_id', backref='buyer', lazy='dynamic')
     sales = db.relationship('Transaction', foreign_keys='Transaction.seller_id', backref='seller', lazy='dynamic')
 
-    def __init__(self, username: str, email: str, password: str, ethereum_address: str = None):
+    def __init__(self, username: str, email: str, password: str, ethereum_address: str = None,
+                 role: str = 'reader'):
         self.username = username
         self.email = email
         self.set_password(password)
         self.ethereum_address = ethereum_address
+        self.role = role
+        self.is_author = role == 'author'
 
     def set_password(self, password: str) -> None:
         """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
         """Verify password."""
-        return check_password_hash(self.password_hash, password)
+        if not self.password_hash.startswith('$argon2'):
+            # Legacy werkzeug pbkdf2 hash
+            return check_password_hash(self.password_hash, password)
+        try:
+            return password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    @staticmethod
+    def dummy_check_password(password: str) -> None:
+        """Spend the cost of one password check when no user matched, to avoid timing leaks."""
+        global _dummy_password_hash
+        if _dummy_password_hash is None:
+            _dummy_password_hash = password_hasher.hash('dummy-password')
+        try:
+            password_hasher.verify(_dummy_password_hash, password)
+        except (VerificationError, InvalidHashError):
+            pass
 
     def to_dict(self) -> dict:
         """Convert user to dictionary."""
@@ -41,9 +70,10 @@ class User(db.Model):
             'username': self.username,
             'email': self.email,
             'ethereum_address': self.ethereum_address,
+            'role': self.role,
             'is_author': self.is_author,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
 
     def __repr__(self) -> str:
@@ -1,10 +1,10 @@
 from flask import Blueprint
-from .auth_routes import auth_bp
-from .book_routes import book_bp
-from .payment_routes import payment_bp
 
 def init_routes(app):
     """Initialize all route blueprints."""
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(book_bp, url_prefix='/api/books')
-    app.register_blueprint(payment_bp, url_prefix='/api/payments')
\ No newline at end of file
+    # Imported here so that importing the package (e.g. for CLI commands)
+    # doesn't pull in the route modules and their dependencies
+    from .auth_routes import auth_bp
+
+    # Book and payment routes are FastAPI routers, mounted by backend.api.create_api
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
\ No newline at end of file
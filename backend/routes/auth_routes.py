@@ -1,20 +1,31 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 import jwt
 from functools import wraps
 from ..models.user import User
-from ..utils.eth import EthereumHandler
+from ..utils.eth import verify_eth_signature
+from ..utils.auth import JWT_SECRET, decode_token, user_cache
 from ..database import db
+from ..limiter import limiter
 import os
 
 auth_bp = Blueprint('auth', __name__)
-eth_handler = EthereumHandler()
 
 # Environment variables
-JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key')
 JWT_EXPIRATION = int(os.getenv('JWT_EXPIRATION', 86400))  # 24 hours
 
+def load_user(user_id: int):
+    """Fetch a user, serving repeat lookups from a short-lived cache."""
+    user = user_cache.get(user_id)
+    if user is not None:
+        # Attach the cached row to this request's session without a SELECT
+        return db.session.merge(user, load=False)
+
+    user = User.query.filter_by(id=user_id).first()
+    if user is not None:
+        user_cache.set(user_id, user)
+    return user
+
 def token_required(f):
     """Decorator to check valid JWT token."""
     @wraps(f)
@@ -26,8 +37,8 @@ def token_required(f):
         
         try:
             token = token.split('Bearer ')[1]
-            data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
-            current_user = User.query.filter_by(id=data['user_id']).first()
+            data = decode_token(token)
+            current_user = load_user(data['user_id'])
         except Exception as e:
             return jsonify({'message': 'Invalid token'}), 401
             
@@ -35,7 +46,7 @@ def token_required(f):
     return decorated
 
 @auth_bp.route('/register', methods=['POST'])
-async def register():
+def register():
     """Register a new user."""
     try:
         data = request.get_json()
@@ -44,17 +55,25 @@ async def register():
         if not all(field in data for field in required_fields):
             return jsonify({'message': 'Missing required fields'}), 400
 
-        # Check if user exists
-        if User.query.filter_by(email=data['email']).first():
+        role = data.get('role', 'reader')
+        if role not in User.ROLES:
+            return jsonify({'message': 'Invalid role'}), 400
+
+        # Check if user exists (email and username in one query)
+        existing = db.session.query(User.email, User.username).filter(
+            db.or_(User.email == data['email'], User.username == data['username'])
+        ).all()
+
+        if any(email == data['email'] for email, _ in existing):
             return jsonify({'message': 'Email already registered'}), 409
         
-        if User.query.filter_by(username=data['username']).first():
+        if existing:
             return jsonify({'message': 'Username already taken'}), 409
 
         # Verify Ethereum address signature if provided
         if 'signature' in data:
             message = f"Register {data['username']} with {data['eth_address']}"
-            if not await eth_handler.verify_signature(
+            if not verify_eth_signature(
                 message,
                 data['signature'],
                 data['eth_address']
@@ -65,10 +84,9 @@ async def register():
         new_user = User(
             username=data['username'],
             email=data['email'],
-            password=generate_password_hash(data['password']),
-            eth_address=data['eth_address'],
-            role=data.get('role', 'reader'),
-            created_at=datetime.utcnow()
+            password=data['password'],
+            ethereum_address=data['eth_address'],
+            role=role
         )
 
         db.session.add(new_user)
@@ -84,7 +102,8 @@ async def register():
         return jsonify({'message': f'Registration failed: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
-async def login():
+@limiter.limit(lambda: current_app.config['LOGIN_RATE_LIMIT'])
+def login():
     """User login endpoint."""
     try:
         data = request.get_json()
@@ -94,13 +113,17 @@ async def login():
 
         user = User.query.filter_by(email=data['email']).first()
 
-        if not user or not check_password_hash(user.password, data['password']):
+        if not user:
+            User.dummy_check_password(data['password'])
+            return jsonify({'message': 'Invalid credentials'}), 401
+
+        if not user.check_password(data['password']):
             return jsonify({'message': 'Invalid credentials'}), 401
 
         # Generate JWT token
         token = jwt.encode({
             'user_id': user.id,
-            'eth_address': user.eth_address,
+            'eth_address': user.ethereum_address,
             'role': user.role,
             'exp': datetime.utcnow() + timedelta(seconds=JWT_EXPIRATION)
         }, JWT_SECRET)
@@ -111,7 +134,7 @@ async def login():
                 'id': user.id,
                 'username': user.username,
                 'email': user.email,
-                'eth_address': user.eth_address,
+                'eth_address': user.ethereum_address,
                 'role': user.role
             }
         }), 200
@@ -128,15 +151,15 @@ def get_profile(current_user):
             'id': current_user.id,
             'username': current_user.username,
             'email': current_user.email,
-            'eth_address': current_user.eth_address,
+            'eth_address': current_user.ethereum_address,
             'role': current_user.role,
-            'created_at': current_user.created_at.isoformat()
+            'created_at': current_user.created_at
         }
     }), 200
 
 @auth_bp.route('/profile', methods=['PUT'])
 @token_required
-async def update_profile(current_user):
+def update_profile(current_user):
     """Update user profile."""
     try:
         data = request.get_json()
@@ -152,23 +175,24 @@ async def update_profile(current_user):
             current_user.username = data['username']
 
         if 'password' in data:
-            current_user.password = generate_password_hash(data['password'])
+            current_user.set_password(data['password'])
 
         if 'eth_address' in data:
             if 'signature' not in data:
                 return jsonify({'message': 'Signature required for address change'}), 400
-                
+
             message = f"Update eth_address to {data['eth_address']}"
-            if not await eth_handler.verify_signature(
+            if not verify_eth_signature(
                 message,
                 data['signature'],
                 data['eth_address']
             ):
                 return jsonify({'message': 'Invalid Ethereum signature'}), 400
                 
-            current_user.eth_address = data['eth_address']
+            current_user.ethereum_address = data['eth_address']
 
         db.session.commit()
+        user_cache.pop(current_user.id)
         return jsonify({'message': 'Profile updated successfully'}), 200
 
     except Exception as e:
@@ -176,7 +200,7 @@ async def update_profile(current_user):
         return jsonify({'message': f'Update failed: {str(e)}'}), 500
 
 @auth_bp.route('/verify-signature', methods=['POST'])
-async def verify_signature():
+def verify_signature():
     """Verify an Ethereum signature."""
     try:
         data = request.get_json()
@@ -185,7 +209,7 @@ async def verify_signature():
         if not all(field in data for field in required_fields):
             return jsonify({'message': 'Missing required fields'}), 400
 
-        is_valid = await eth_handler.verify_signature(
+        is_valid = verify_eth_signature(
             data['message'],
             data['signature'],
             data['address']
@@ -1,54 +1,93 @@
 # backend/routes/book_routes.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Form
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import ipfshttpclient
-from datetime import datetime
 
-from ..database import get_db
+from ..dependencies import get_db
 from ..models import Book, User, Transaction
 from ..schemas import BookCreate, BookUpdate, BookResponse
 from ..utils.auth import get_current_user
 from ..utils.ipfs import IPFSManager
+from ..config import Config
+from ..utils.cache import SharedCache
 
 router = APIRouter()
 ipfs = IPFSManager()
 
+# Read-mostly book pages, shared by all workers; invalidated when a book changes or sells
+BOOK_CACHE_TTL = 60  # seconds
+_book_cache = SharedCache('books:detail', BOOK_CACHE_TTL, Config.CACHE_REDIS_URL)
+_book_list_cache = SharedCache('books:list', BOOK_CACHE_TTL, Config.CACHE_REDIS_URL)
+
+# Keyset cursors use the id alone: ids grow in insertion order, and database-set
+# timestamps don't round-trip exactly through a bound parameter on SQLite
+def paginate_books(stmt, after_id: Optional[int]):
+    """Apply keyset pagination on id, newest first."""
+    if after_id is not None:
+        stmt = stmt.where(Book.id < after_id)
+    return stmt.order_by(Book.id.desc())
+
+def paginate_transactions(stmt, after_id: Optional[int]):
+    """Apply keyset pagination on id, newest first."""
+    if after_id is not None:
+        stmt = stmt.where(Transaction.id < after_id)
+    return stmt.order_by(Transaction.id.desc())
+
+def book_payload(book: Book) -> dict:
+    """Serialize a book the way BookResponse renders it, for caching."""
+    return BookResponse.model_validate(book).model_dump(mode='json')
+
+async def invalidate_book_cache(book_id: int) -> None:
+    """Drop cached responses that may include the given book."""
+    await _book_cache.pop(book_id)
+    await _book_list_cache.clear()
+
 @router.post("/books/", response_model=BookResponse)
 async def create_book(
+    background_tasks: BackgroundTasks,
     title: str = Form(...),
     description: str = Form(...),
-    price: float = Form(...),
-    royalty_percentage: float = Form(...),
+    price: int = Form(..., ge=0),  # Wei
+    royalty_percentage: int = Form(..., ge=0, le=100),
+    blockchain_id: int = Form(...),  # Id from the BookListed event of the on-chain listing
+    author_id: Optional[int] = Form(None),  # Required when a seller lists an author's book
     pdf_file: UploadFile = File(...),
     cover_file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if current_user.role not in ['author', 'seller']:
         raise HTTPException(status_code=403, detail="Not authorized")
+    if current_user.role == 'author':
+        author_id = current_user.id
+    elif author_id is None:
+        raise HTTPException(status_code=400, detail="author_id is required")
     
     try:
-        # Upload files to IPFS
-        pdf_hash = await ipfs.add_file(pdf_file)
-        cover_hash = await ipfs.add_file(cover_file)
+        # Add both files to IPFS in one request; only the CIDs are needed to respond
+        pdf_hash, cover_hash = await ipfs.add_many([pdf_file, cover_file], pin=False)
+
+        # Pinning (and the provider announcement that follows) happens after the response
+        background_tasks.add_task(ipfs.pin_file, pdf_hash)
+        background_tasks.add_task(ipfs.pin_file, cover_hash)
 
         book = Book(
             title=title,
             description=description,
             price=price,
             royalty_percentage=royalty_percentage,
-            pdf_hash=pdf_hash,
-            cover_hash=cover_hash,
-            author_id=current_user.id if current_user.role == 'author' else None,
-            seller_id=current_user.id if current_user.role == 'seller' else None,
-            is_active=True,
-            created_at=datetime.utcnow()
+            ipfs_hash=pdf_hash,
+            cover_ipfs_hash=cover_hash,
+            blockchain_id=blockchain_id,
+            author_id=author_id,
+            seller_id=current_user.id if current_user.role == 'seller' else None
         )
         
         db.add(book)
-        db.commit()
-        db.refresh(book)
+        await db.commit()
+        await db.refresh(book)
+        await _book_list_cache.clear()
         
         return book
     except Exception as e:
@@ -56,21 +95,31 @@ async def create_book(
 
 @router.get("/books/", response_model=List[BookResponse])
 async def list_books(
-    skip: int = 0,
+    after_id: Optional[int] = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    books = db.query(Book).filter(Book.is_active == True).offset(skip).limit(limit).all()
+    cache_key = f"{after_id}:{limit}"
+    books = await _book_list_cache.get(cache_key)
+    if books is None:
+        stmt = paginate_books(select(Book).where(Book.is_available == True), after_id)
+        result = await db.execute(stmt.limit(limit))
+        books = [book_payload(book) for book in result.scalars()]
+        await _book_list_cache.set(cache_key, books)
     return books
 
 @router.get("/books/{book_id}", response_model=BookResponse)
 async def get_book(
     book_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    book = db.query(Book).filter(Book.id == book_id).first()
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
+    book = await _book_cache.get(book_id)
+    if book is None:
+        row = await db.get(Book, book_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Book not found")
+        book = book_payload(row)
+        await _book_cache.set(book_id, book)
     return book
 
 @router.put("/books/{book_id}", response_model=BookResponse)
@@ -78,110 +127,132 @@ async def update_book(
     book_id: int,
     book_update: BookUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
     if (book.author_id != current_user.id and book.seller_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    for key, value in book_update.dict(exclude_unset=True).items():
+    for key, value in book_update.model_dump(exclude_unset=True).items():
         setattr(book, key, value)
     
-    db.commit()
-    db.refresh(book)
+    await db.commit()
+    await db.refresh(book)
+    await invalidate_book_cache(book_id)
     return book
 
 @router.get("/author/books/", response_model=List[BookResponse])
 async def get_author_books(
+    after_id: Optional[int] = None,
+    limit: int = 100,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if current_user.role != 'author':
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    books = db.query(Book).filter(Book.author_id == current_user.id).all()
+    stmt = paginate_books(select(Book).where(Book.author_id == current_user.id), after_id)
+    result = await db.execute(stmt.limit(limit))
+    books = result.scalars().all()
     return books
 
 @router.get("/seller/books/", response_model=List[BookResponse])
 async def get_seller_books(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if current_user.role != 'seller':
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    books = db.query(Book).filter(Book.seller_id == current_user.id).all()
+    result = await db.execute(select(Book).where(Book.seller_id == current_user.id))
+    books = result.scalars().all()
     return books
 
 @router.get("/books/{book_id}/download")
 async def download_book(
     book_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
     # Check if user has purchased the book
-    purchase = db.query(Transaction).filter(
-        Transaction.book_id == book_id,
-        Transaction.buyer_address == current_user.eth_address,
-        Transaction.status == "completed"
-    ).first()
+    result = await db.execute(
+        select(Transaction.id).where(
+            Transaction.book_id == book_id,
+            Transaction.buyer_address == current_user.ethereum_address,
+            Transaction.status == "completed"
+        ).limit(1)
+    )
+    purchase = result.scalar_one_or_none()
     
     if not purchase:
         raise HTTPException(status_code=403, detail="Book not purchased")
     
-    return {"download_url": f"http://localhost:8080/ipfs/{book.pdf_hash}"}
+    # The gateway serves the bytes; we only hand out a link it can verify
+    return {"download_url": ipfs.get_signed_url(book.ipfs_hash, current_user.id)}
 
 @router.put("/books/{book_id}/status")
 async def update_book_status(
     book_id: int,
-    is_active: bool,
+    is_available: bool,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
     if (book.author_id != current_user.id and book.seller_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    book.is_active = is_active
-    db.commit()
+    book.is_available = is_available
+    await db.commit()
+    await invalidate_book_cache(book_id)
     
     return {"message": "Status updated successfully"}
 
 @router.get("/books/{book_id}/sales")
 async def get_book_sales(
     book_id: int,
+    include_transactions: bool = False,
+    after_id: Optional[int] = None,
+    limit: int = 100,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    book = db.query(Book).filter(Book.id == book_id).first()
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
     if (book.author_id != current_user.id and book.seller_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    transactions = db.query(Transaction).filter(
-        Transaction.book_id == book_id,
-        Transaction.status == "completed"
-    ).all()
-    
-    total_sales = len(transactions)
-    total_revenue = sum(t.amount for t in transactions)
-    total_royalties = sum(t.amount * (book.royalty_percentage/100) for t in transactions)
-    
-    return {
-        "total_sales": total_sales,
-        "total_revenue": total_revenue,
-        "total_royalties": total_royalties,
-        "transactions": transactions
-    }
\ No newline at end of file
+    # Totals are kept up to date on the book row by purchase_book; wei goes out as strings
+    sales = {
+        "total_sales": book.total_sales,
+        "total_revenue": str(book.total_revenue),
+        "total_royalties": str(book.total_revenue * book.royalty_percentage // 100)
+    }
+
+    if include_transactions:
+        # Plain column rows; no ORM objects are hydrated just to be serialized
+        stmt = select(
+            Transaction.id,
+            Transaction.transaction_hash,
+            Transaction.buyer_address,
+            Transaction.amount,
+            Transaction.timestamp
+        ).where(
+            Transaction.book_id == book_id,
+            Transaction.status == "completed"
+        )
+        result = await db.execute(paginate_transactions(stmt, after_id).limit(limit))
+        sales["transactions"] = [dict(row) for row in result.mappings()]
+
+    return sales
\ No newline at end of file
@@ -1,119 +1,218 @@
 # backend/routes/payment_routes.py
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from ..dependencies import get_db
+from ..json_provider import ORJSONProvider
+from ..models import Book, Transaction
+from ..models.transaction import TransactionStatus
+from ..utils.eth import EthereumHandler, get_eth_handler
 from web3 import Web3
-from typing import Dict
-from ..database import get_db
-from ..models import User, Book, Transaction
-from ..utils.eth import get_contract
-from sqlalchemy.orm import Session
-import json
-
-router = APIRouter()
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))  # Local Ganache for testing
+from web3.exceptions import TransactionNotFound
+from .book_routes import invalidate_book_cache
+from sqlalchemy import func, distinct, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+import asyncio
+import logging
+import orjson
+
+class ORJSONResponse(_ORJSONResponse):
+    """FastAPI response rendered with the same orjson options as the Flask ORJSONProvider."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSONProvider.option)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = logging.getLogger(__name__)
+
+# How long the background task waits for a purchase to be mined
+PURCHASE_RECEIPT_TIMEOUT = 120  # seconds
+
+async def settle_purchase(async_session, tx_hash: str, receipt) -> bool:
+    """
+    Mark a pending purchase completed or failed from its receipt.
+    The update only matches a still-pending row, so the book's counters are
+    bumped exactly once however many times a purchase is settled.
+    Returns:
+        bool: True if this call settled the row
+    """
+    completed = receipt['status'] == 1
+    status = TransactionStatus.COMPLETED if completed else TransactionStatus.FAILED
+    async with async_session() as session:
+        result = await session.execute(
+            update(Transaction).where(
+                Transaction.transaction_hash == tx_hash,
+                Transaction.status == TransactionStatus.PENDING.value
+            ).values(
+                status=status.value,
+                gas_used=receipt['gasUsed'],
+                block_number=receipt['blockNumber'],
+                completed_at=func.now()
+            ).returning(Transaction.book_id, Transaction.amount)
+        )
+        settled = result.first()
+        if settled is not None and completed:
+            # Bump the counters in place so concurrent purchases can't lose updates
+            await session.execute(
+                update(Book).where(Book.id == settled.book_id).values(
+                    total_sales=Book.total_sales + 1,
+                    total_revenue=Book.total_revenue + settled.amount
+                )
+            )
+        await session.commit()
+
+    if settled is not None and completed:
+        # Cached book pages include the sales counters
+        await invalidate_book_cache(settled.book_id)
+    return settled is not None
+
+async def confirm_purchase(async_session, eth: EthereumHandler, tx_hash: str) -> None:
+    """Wait for a submitted purchase to be mined, then settle its pending row."""
+    try:
+        receipt = await eth.wait_for_receipt(tx_hash, timeout=PURCHASE_RECEIPT_TIMEOUT)
+        await settle_purchase(async_session, tx_hash, receipt)
+    except Exception as e:
+        # The row stays pending; get_transaction_status settles it once the receipt exists
+        logger.warning(f"Purchase {tx_hash} left pending: {str(e)}")
 
 @router.post("/purchase/{book_id}")
 async def purchase_book(
     book_id: int,
     buyer_address: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    eth: EthereumHandler = Depends(get_eth_handler),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Get book details
-        book = db.query(Book).filter(Book.id == book_id).first()
-        if not book:
+        # Get book with its seller and author in one query
+        result = await db.execute(
+            select(Book).options(
+                joinedload(Book.seller),
+                joinedload(Book.author)
+            ).where(Book.id == book_id)
+        )
+        book = result.scalar_one_or_none()
+        if not book or book.is_deleted:
             raise HTTPException(status_code=404, detail="Book not found")
 
-        # Get seller and author details
-        seller = db.query(User).filter(User.id == book.seller_id).first()
-        author = db.query(User).filter(User.id == book.author_id).first()
-
-        # Get contract instance
-        contract = get_contract()
-
-        # Calculate royalty
-        royalty_amount = int(float(book.price) * (book.royalty_percentage / 100))
-        seller_amount = int(float(book.price) - royalty_amount)
-
-        # Create transaction in smart contract
-        tx_hash = contract.functions.purchaseBook(
-            book_id,
-            seller.eth_address,
-            author.eth_address,
-            seller_amount,
-            royalty_amount
-        ).transact({'from': buyer_address, 'value': book.price})
-
-        # Store transaction in database
-        transaction = Transaction(
-            book_id=book_id,
-            buyer_address=buyer_address,
-            seller_address=seller.eth_address,
-            amount=book.price,
-            status="completed",
-            tx_hash=tx_hash.hex()
-        )
-        db.add(transaction)
-        db.commit()
+        # Checked on the row we already loaded; the contract re-checks availability
+        # atomically on-chain, so a book delisted in between makes transact() revert
+        if not book.is_available:
+            raise HTTPException(status_code=400, detail="Book is not available")
+
+        seller = book.seller or book.author
+
+        # Shared handler; the contract ABI is parsed once per process
+        contract = eth.contract
+
+        # Create transaction in smart contract; the contract splits royalties itself.
+        # web3 is synchronous, so keep the RPC off the event loop
+        tx_hash = Web3.to_hex(await asyncio.to_thread(
+            contract.functions.purchaseBook(book.blockchain_id).transact,
+            {'from': buyer_address, 'value': book.price}
+        ))
+
+        # Record the purchase as pending before responding, so every submitted
+        # transaction has a row keyed by its hash even if this process dies
+        try:
+            transaction = Transaction(
+                transaction_hash=tx_hash,
+                seller_id=seller.id,
+                amount=book.price,
+                book_id=book_id,
+                buyer_address=buyer_address,
+                author_id=book.author_id,
+                royalty_percentage=book.royalty_percentage
+            )
+            db.add(transaction)
+            await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record purchase {tx_hash}: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Purchase {tx_hash} was sent but not recorded")
+
+        # Mined status, gas and the book's counters are filled in after the response
+        background_tasks.add_task(confirm_purchase, request.app.state.async_session, eth, tx_hash)
 
         return {
             "status": "success",
-            "tx_hash": tx_hash.hex(),
-            "message": "Book purchased successfully"
+            "tx_hash": tx_hash,
+            "transaction_id": transaction.id,
+            "message": "Book purchase submitted"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/transaction/{tx_hash}")
-async def get_transaction_status(tx_hash: str, db: Session = Depends(get_db)):
+async def get_transaction_status(
+    tx_hash: str,
+    request: Request,
+    eth: EthereumHandler = Depends(get_eth_handler),
+    db: AsyncSession = Depends(get_db)
+):
     try:
-        # Get transaction receipt from blockchain
-        tx_receipt = w3.eth.get_transaction_receipt(tx_hash)
-        
         # Get transaction from database
-        transaction = db.query(Transaction).filter(Transaction.tx_hash == tx_hash).first()
+        result = await db.execute(select(Transaction).where(Transaction.transaction_hash == tx_hash))
+        transaction = result.scalar_one_or_none()
         
         if not transaction:
             raise HTTPException(status_code=404, detail="Transaction not found")
 
-        return {
+        # Get transaction receipt from blockchain; there is none until it is mined
+        try:
+            tx_receipt = await asyncio.to_thread(eth.w3.eth.get_transaction_receipt, tx_hash)
+        except TransactionNotFound:
+            tx_receipt = None
+
+        # Reconcile a purchase whose background confirmation never finished
+        if tx_receipt is not None and transaction.status == TransactionStatus.PENDING.value:
+            await settle_purchase(request.app.state.async_session, tx_hash, tx_receipt)
+            await db.refresh(transaction)
+
+        # Returned directly so orjson serializes the timestamp itself
+        return ORJSONResponse({
             "status": "confirmed" if tx_receipt else "pending",
             "block_number": tx_receipt["blockNumber"] if tx_receipt else None,
             "transaction": {
                 "book_id": transaction.book_id,
                 "amount": transaction.amount,
                 "buyer": transaction.buyer_address,
-                "seller": transaction.seller_address,
-                "timestamp": transaction.created_at.isoformat()
+                "seller_id": transaction.seller_id,
+                "status": transaction.status,
+                "timestamp": transaction.timestamp
             }
-        }
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/royalties/{author_id}")
-async def get_author_royalties(author_id: int, db: Session = Depends(get_db)):
+async def get_author_royalties(author_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        # Get all transactions for author's books
-        author_books = db.query(Book).filter(Book.author_id == author_id).all()
-        book_ids = [book.id for book in author_books]
-        
-        transactions = db.query(Transaction).filter(
-            Transaction.book_id.in_(book_ids)
-        ).all()
-
-        total_royalties = sum([
-            t.amount * (b.royalty_percentage/100) 
-            for t in transactions 
-            for b in author_books 
-            if b.id == t.book_id
-        ])
+        # Sum the per-sale royalties stored when each purchase was recorded
+        result = await db.execute(
+            select(
+                func.coalesce(func.sum(Transaction.royalty_amount), 0),
+                func.count(Transaction.id),
+                func.count(distinct(Transaction.book_id))
+            ).where(
+                Transaction.author_id == author_id,
+                Transaction.status == "completed"
+            )
+        )
+        total_royalties, transaction_count, books_sold = result.one()
 
         return {
-            "total_royalties": total_royalties,
-            "transaction_count": len(transactions),
-            "books_sold": len(set([t.book_id for t in transactions]))
+            # Wei totals can pass 2**64, which JSON numbers (and orjson) can't carry exactly
+            "total_royalties": str(int(total_royalties)),
+            "transaction_count": transaction_count,
+            "books_sold": books_sold
         }
 
     except Exception as e:
@@ -0,0 +1,44 @@
+# backend/schemas.py
+from datetime import datetime
+from typing import Annotated, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer
+
+# Wei totals can pass 2**64, which JSON numbers (and orjson) can't carry exactly
+WeiTotal = Annotated[int, PlainSerializer(str, return_type=str, when_used='json')]
+
+class BookCreate(BaseModel):
+    title: str = Field(..., max_length=200)
+    description: Optional[str] = None
+    price: int = Field(..., ge=0)  # Wei
+    royalty_percentage: int = Field(..., ge=0, le=100)
+    categories: List[str] = []
+    tags: List[str] = []
+
+class BookUpdate(BaseModel):
+    title: Optional[str] = Field(None, max_length=200)
+    description: Optional[str] = None
+    price: Optional[int] = Field(None, ge=0)  # Wei
+    categories: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+
+class BookResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    description: Optional[str] = None
+    price: int  # Wei
+    royalty_percentage: int
+    ipfs_hash: str
+    cover_ipfs_hash: Optional[str] = None
+    blockchain_id: int
+    author_id: int
+    seller_id: Optional[int] = None
+    is_available: bool = True
+    total_sales: int = 0
+    total_revenue: WeiTotal = 0
+    categories: List[str] = []
+    tags: List[str] = []
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,4 +1,5 @@
-from .ipfs import IPFSHandler
-from .eth import EthereumHandler, Web3ConnectionError, ContractError
+from .ipfs import IPFSManager
+from .eth import EthereumHandler, EthereumError, ReceiptTimeout, get_eth_handler
+from .cache import SharedCache, TTLCache
 
-__all__ = ['IPFSHandler', 'EthereumHandler', 'Web3ConnectionError', 'ContractError']
\ No newline at end of file
+__all__ = ['IPFSManager', 'EthereumHandler', 'EthereumError', 'ReceiptTimeout', 'get_eth_handler', 'TTLCache', 'SharedCache']
\ No newline at end of file
@@ -0,0 +1,57 @@
+# backend/utils/auth.py
+import hashlib
+import os
+import time
+import jwt
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from ..dependencies import get_db
+from ..models.user import User
+from .cache import TTLCache
+
+JWT_SECRET = os.getenv('JWT_SECRET', 'your-secret-key')
+
+# Short-lived caches shared by the Flask and FastAPI token checks
+AUTH_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 60  # seconds
+USER_CACHE_TTL = 30  # seconds
+token_cache = TTLCache(TOKEN_CACHE_TTL, AUTH_CACHE_SIZE)
+user_cache = TTLCache(USER_CACHE_TTL, AUTH_CACHE_SIZE)
+
+def decode_token(token: str) -> dict:
+    """Decode a JWT, reusing the result for repeat requests with the same token."""
+    key = hashlib.sha256(token.encode()).hexdigest()
+    data = token_cache.get(key)
+    if data is None:
+        data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
+        # Never keep a token cached past its own expiry
+        ttl = min(TOKEN_CACHE_TTL, data['exp'] - time.time()) if 'exp' in data else TOKEN_CACHE_TTL
+        token_cache.set(key, data, ttl)
+    return data
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Resolve the bearer token to a user, using the shared token and user caches."""
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Token is missing")
+
+    try:
+        data = decode_token(authorization.split('Bearer ')[1])
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user_id = data['user_id']
+    user = user_cache.get(user_id)
+    if user is not None:
+        # Attach the cached row to this request's session without a SELECT
+        return await db.merge(user, load=False)
+
+    user = await db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user_cache.set(user_id, user)
+    return user
\ No newline at end of file
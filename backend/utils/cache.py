@@ -0,0 +1,92 @@
+import time
+import orjson
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """Small in-process cache whose entries expire after a TTL."""
+
+    def __init__(self, ttl: float, maxsize: int = 4096):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the oldest entry when full."""
+        if len(self._entries) >= self.maxsize:
+            self._entries.pop(next(iter(self._entries), None), None)
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+    def pop(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+class SharedCache:
+    """
+    TTL cache shared by every worker process through Redis.
+    Values are stored as orjson bytes, so only plain JSON-able data can be cached.
+    Without a Redis URL it falls back to an in-process TTLCache (single-worker runs).
+    """
+
+    def __init__(self, namespace: str, ttl: int, redis_url: Optional[str] = None, maxsize: int = 4096):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.redis_url = redis_url
+        self._redis = None
+        self._local = None if redis_url else TTLCache(ttl, maxsize)
+
+    def _client(self):
+        """Return the Redis client, connecting on first use."""
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    async def _key(self, key: Hashable) -> str:
+        # Keys carry the namespace generation so clear() is a single INCR
+        generation = await self._client().get(f"{self.namespace}:gen") or b'0'
+        return f"{self.namespace}:{generation.decode()}:{key}"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None if missing or expired."""
+        if self._local is not None:
+            data = self._local.get(key)
+        else:
+            data = await self._client().get(await self._key(key))
+        return None if data is None else orjson.loads(data)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Store a value for the cache's TTL."""
+        data = orjson.dumps(value)
+        if self._local is not None:
+            self._local.set(key, data)
+        else:
+            await self._client().set(await self._key(key), data, ex=self.ttl)
+
+    async def pop(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        if self._local is not None:
+            self._local.pop(key)
+        else:
+            await self._client().delete(await self._key(key))
+
+    async def clear(self) -> None:
+        """Drop all entries; in Redis the old generation's keys simply expire."""
+        if self._local is not None:
+            self._local.clear()
+        else:
+            await self._client().incr(f"{self.namespace}:gen")
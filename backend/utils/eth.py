@@ -1,17 +1,89 @@
 from web3 import Web3
 from web3.middleware import geth_poa_middleware
-import json
+import asyncio
+import hmac
 import os
+from functools import lru_cache
 from typing import Dict, Any, Optional, Tuple, List
 import logging
+import threading
+import coincurve
+import time
+from eth_account import Account
 from eth_account.messages import encode_defunct
-from datetime import datetime, timedelta
+from eth_account.signers.local import LocalAccount
+from eth_hash.auto import keccak
 from web3.exceptions import TransactionNotFound, TimeExhausted
+from ..config import Config, load_contract_artifact
+from ..web3_config import RPC_TIMEOUT, create_web3_provider, shared_rpc_session
+
+logger = logging.getLogger(__name__)
 
 class EthereumError(Exception):
     """Base exception for Ethereum-related errors"""
     pass
 
+class ReceiptTimeout(EthereumError):
+    """Raised when a transaction is not mined in time; the caller may retry the wait"""
+    pass
+
+@lru_cache(maxsize=4096)
+def _eip191_digest(message: bytes) -> bytes:
+    """Keccak-256 of an EIP-191 personal_sign message, memoized for repeated messages."""
+    return keccak(b"\x19Ethereum Signed Message:\n" + str(len(message)).encode() + message)
+
+def verify_eth_signature(message: str, signature: str, address: str) -> bool:
+    """
+    Check that an EIP-191 personal_sign signature was produced by address.
+    Recovery is pure local crypto, so no node connection is needed.
+    Returns:
+        bool: True if the recovered signer matches address
+    """
+    try:
+        signature_bytes = bytes.fromhex(signature[2:] if signature.startswith('0x') else signature)
+        if len(signature_bytes) != 65:
+            raise ValueError(f"Expected a 65-byte signature, got {len(signature_bytes)}")
+
+        # r || s || v with v normalized to the 0/1 recovery id libsecp256k1 expects
+        recovery_id = signature_bytes[64] - 27 if signature_bytes[64] >= 27 else signature_bytes[64]
+        public_key = coincurve.PublicKey.from_signature_and_message(
+            signature_bytes[:64] + bytes([recovery_id]),
+            _eip191_digest(message.encode()),
+            hasher=None
+        )
+        signer = keccak(public_key.format(compressed=False)[1:])[-20:]
+        return hmac.compare_digest(signer, bytes.fromhex(address.removeprefix('0x')))
+    except Exception:
+        # Fall back to eth-account for input the fast path can't handle
+        pass
+
+    try:
+        signer = Account.recover_message(encode_defunct(text=message), signature=signature)
+        return hmac.compare_digest(signer.lower(), address.lower())
+    except Exception as e:
+        logger.warning(f"Signature verification failed: {str(e)}")
+        return False
+
+def verify_web3(app) -> bool:
+    """Check that the app's Web3 provider is reachable and on the expected Ganache network."""
+    try:
+        web3_provider = app.config['WEB3_PROVIDER_FACTORY']()
+        if not web3_provider.is_connected():
+            logger.error("Unable to connect to Ethereum network")
+            return False
+
+        network_id = web3_provider.net.version
+        expected_id = app.config['GANACHE_CONFIG']['NETWORK_ID']
+        if network_id != expected_id:
+            logger.error(f"Connected to wrong network. Expected Ganache (ID: {expected_id}), got {network_id}")
+            return False
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Web3 health check failed: {str(e)}")
+        return False
+
 class EthereumHandler:
     # Ganache-specific configurations
     GANACHE_CONFIG = {
@@ -21,18 +93,25 @@ class EthereumHandler:
         'GAS_LIMIT': 6721975,
         'DEFAULT_GAS_PRICE': 20000000000  # 20 gwei
     }
+    GAS_PRICE_TTL_NS = 60_000_000_000  # 60 seconds
+    GAS_PRICE_RETRY_NS = 5_000_000_000  # 5 seconds between refreshes while the node is down
+    MIN_GAS_PRICE = 10**9  # 1 gwei
+    MAX_GAS_PRICE = 500 * 10**9  # 500 gwei
 
     def __init__(self, provider_url: str = GANACHE_CONFIG['PROVIDER_URL']):
         """Initialize Ethereum connection with Ganache."""
-        self.w3 = Web3(Web3.HTTPProvider(provider_url))
+        self.rpc_session = shared_rpc_session()
+        self.w3 = create_web3_provider(provider_url, session=self.rpc_session)
         self.setup_logging()
         self.verify_ganache_connection()
         self.load_contract()
-        self.gas_price_cache = {
-            'timestamp': 0,
-            'price': self.GANACHE_CONFIG['DEFAULT_GAS_PRICE'],
-            'cache_duration': 30  # Cache duration in seconds
-        }
+        self._gas_expires_ns = 0
+        self._gas_refreshing = False
+        self._gas_lock = threading.Lock()
+        self._gas_price = self.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+        self._nonces: Dict[str, int] = {}
+        self._nonce_lock = threading.Lock()
+        self._accounts: Dict[str, LocalAccount] = {}
 
     def setup_logging(self):
         """Set up logging for Ethereum operations."""
@@ -43,32 +122,68 @@ class EthereumHandler:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
+    def batch_rpc(self, calls: List[Tuple[str, list]]) -> List[Any]:
+        """
+        Send several JSON-RPC calls in a single HTTP request.
+        Args:
+            calls: (method, params) pairs
+        Returns:
+            List[Any]: Raw results in the order of calls
+        """
+        payload = [
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, (method, params) in enumerate(calls)
+        ]
+        response = self.rpc_session.post(
+            self.w3.provider.endpoint_uri,
+            json=payload,
+            timeout=RPC_TIMEOUT
+        )
+        response.raise_for_status()
+
+        # Batch responses may come back in any order
+        replies = {reply['id']: reply for reply in response.json()}
+        results = []
+        for request_id, (method, _) in enumerate(calls):
+            reply = replies.get(request_id)
+            if reply is None or 'error' in reply:
+                error = reply['error'] if reply else 'no response'
+                raise EthereumError(f"RPC {method} failed: {error}")
+            results.append(reply['result'])
+        return results
+
+    def raw_rpc(self, method: str, params: list) -> Any:
+        """Send one JSON-RPC call straight to the node, skipping web3's middleware and formatters."""
+        return self.batch_rpc([(method, params)])[0]
+
     def verify_ganache_connection(self) -> bool:
         """Verify connection to Ganache network with enhanced error handling."""
         try:
-            if not self.w3.is_connected():
-                raise EthereumError("Not connected to Ganache network")
+            # One round trip for the network checks; a dead node fails the POST itself
+            network_id, chain_id, accounts = self.batch_rpc([
+                ('net_version', []),
+                ('eth_chainId', []),
+                ('eth_accounts', [])
+            ])
 
-            network_id = self.w3.net.version
             if network_id != self.GANACHE_CONFIG['NETWORK_ID']:
                 raise EthereumError(
                     f"Wrong network ID. Expected {self.GANACHE_CONFIG['NETWORK_ID']}, got {network_id}"
                 )
 
-            chain_id = self.w3.eth.chain_id
+            chain_id = int(chain_id, 16)
             if chain_id != self.GANACHE_CONFIG['CHAIN_ID']:
                 raise EthereumError(
                     f"Wrong chain ID. Expected {self.GANACHE_CONFIG['CHAIN_ID']}, got {chain_id}"
                 )
 
             # Verify we have access to accounts
-            accounts = self.w3.eth.accounts
             if not accounts:
                 raise EthereumError("No accounts available on Ganache")
 
             # Verify account balances
             for account in accounts[:1]:  # Check at least one account
-                balance = self.w3.eth.get_balance(account)
+                balance = self.w3.eth.get_balance(Web3.to_checksum_address(account))
                 if balance == 0:
                     self.logger.warning(f"Account {account} has zero balance")
 
@@ -82,16 +197,13 @@ class EthereumHandler:
     def load_contract(self):
         """Load smart contract ABI and address for Ganache network with error handling."""
         try:
-            contract_path = os.path.join(
-                os.path.dirname(__file__),
-                '../../smart_contracts/build/contracts/BookMarket.json'
-            )
+            contract_path = Config.CONTRACT_CONFIG['ABI_PATH']
             
             if not os.path.exists(contract_path):
                 raise EthereumError(f"Contract file not found at {contract_path}")
             
-            with open(contract_path, 'r') as f:
-                contract_data = json.load(f)
+            # Parsed once per process and shared with other contract users
+            contract_data = Config.contract_artifact()
             
             self.contract_abi = contract_data.get('abi')
             if not self.contract_abi:
@@ -126,89 +238,209 @@ class EthereumHandler:
     def get_gas_price(self) -> int:
         """
         Get current gas price with caching and fallback mechanism.
+        An expired price is still returned while a background refresh fetches
+        a new one; only the very first lookup waits on the network.
         Returns:
             int: Gas price in Wei
         """
-        current_time = datetime.now().timestamp()
-        
         # Return cached price if still valid
-        if (current_time - self.gas_price_cache['timestamp']) < self.gas_price_cache['cache_duration']:
-            return self.gas_price_cache['price']
-        
+        if time.monotonic_ns() < self._gas_expires_ns:
+            return self._gas_price
+
+        # Stale-while-revalidate once a price has been fetched at least once;
+        # the flag is checked and set under the lock so only one refresh runs
+        if self._gas_expires_ns:
+            with self._gas_lock:
+                if self._gas_refreshing:
+                    return self._gas_price
+                self._gas_refreshing = True
+            threading.Thread(target=self._refresh_gas_price, daemon=True).start()
+            return self._gas_price
+
+        return self._refresh_gas_price()
+
+    def _refresh_gas_price(self) -> int:
+        """Fetch the network gas price into the cache, keeping the last known price on failure."""
         try:
             # Get current gas price from network
-            gas_price = self.w3.eth.gas_price
-            
-            # Validate gas price
-            if gas_price < 1000000000:  # 1 gwei
-                self.logger.warning("Gas price too low, using default")
-                gas_price = self.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
-            elif gas_price > 500000000000:  # 500 gwei
-                self.logger.warning("Gas price too high, using default")
-                gas_price = self.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
-            
-            # Update cache
-            self.gas_price_cache.update({
-                'timestamp': current_time,
-                'price': gas_price
-            })
-            
-            return gas_price
+            return self._cache_gas_price(self.w3.eth.gas_price)
         
         except Exception as e:
             self.logger.error(f"Error getting gas price: {str(e)}")
-            # Return last known price or default
-            return self.gas_price_cache['price']
+            # Keep the last known price or default, and don't retry on every lookup
+            self._gas_expires_ns = time.monotonic_ns() + self.GAS_PRICE_RETRY_NS
+            return self._gas_price
+
+        finally:
+            with self._gas_lock:
+                self._gas_refreshing = False
+
+    def _cache_gas_price(self, gas_price: int) -> int:
+        """Validate a network gas price and store it in the cache."""
+        if gas_price < self.MIN_GAS_PRICE:
+            self.logger.warning("Gas price too low, using default")
+            gas_price = self.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+        elif gas_price > self.MAX_GAS_PRICE:
+            self.logger.warning("Gas price too high, using default")
+            gas_price = self.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+        
+        # Update cache; the expiry is fixed when the price is stored
+        self._gas_price = gas_price
+        self._gas_expires_ns = time.monotonic_ns() + self.GAS_PRICE_TTL_NS
+        return gas_price
 
-    async def deploy_contract(self, account: str, contract_path: str) -> str:
+    def next_nonce(self, address: str, chain_nonce: Optional[int] = None) -> int:
+        """
+        Reserve the next nonce for address.
+        The chain is only asked once per address (or chain_nonce is used if the
+        caller already fetched it); later nonces are counted locally.
+        """
+        with self._nonce_lock:
+            nonce = self._nonces.get(address)
+            if nonce is None:
+                if chain_nonce is None:
+                    chain_nonce = self.w3.eth.get_transaction_count(address, 'pending')
+                nonce = chain_nonce
+            self._nonces[address] = nonce + 1
+            return nonce
+
+    def reset_nonce(self, address: str) -> None:
+        """Forget the local nonce for address so the next one is re-read from the chain."""
+        with self._nonce_lock:
+            self._nonces.pop(address, None)
+
+    def verify_signature(self, message: str, signature: str, address: str) -> bool:
+        """Check that an EIP-191 personal_sign signature was produced by address."""
+        return verify_eth_signature(message, signature, address)
+
+    RECEIPT_POLL_MAX = 2.0  # seconds
+
+    async def wait_for_receipt(self, tx_hash, timeout: float, poll_initial: float = 0.1):
+        """
+        Poll for a transaction receipt without blocking the event loop.
+        The poll interval doubles after each miss, up to RECEIPT_POLL_MAX, so fast
+        confirmations are seen quickly without hammering the node on long waits.
+        Raises:
+            ReceiptTimeout: If no receipt arrives within timeout seconds
+        """
+        deadline = time.monotonic() + timeout
+        poll = poll_initial
+        while True:
+            try:
+                return await asyncio.to_thread(self.w3.eth.get_transaction_receipt, tx_hash)
+            except TransactionNotFound:
+                pass
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # raw_rpc hands back hex strings; web3 calls hand back bytes
+                tx_hex = tx_hash if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)
+                raise ReceiptTimeout(f"Transaction {tx_hex} not mined after {timeout} seconds")
+            await asyncio.sleep(min(poll, remaining))
+            poll = min(poll * 2, self.RECEIPT_POLL_MAX)
+
+    def local_account(self, private_key: str) -> LocalAccount:
+        """Return the signing account for a private key, deriving it only once."""
+        account = self._accounts.get(private_key)
+        if account is None:
+            account = self._accounts[private_key] = self.w3.eth.account.from_key(private_key)
+        return account
+
+    async def deploy_contract(self, private_key: str, contract_path: str,
+                              timeout: Optional[float] = None, poll_initial: float = 0.1) -> str:
         """
         Deploy contract to Ganache network
         Args:
-            account: Address to deploy from
+            private_key: Key of the account to deploy from
             contract_path: Path to contract JSON file
+            timeout: Seconds to wait for the receipt (defaults to CONTRACT_CONFIG['DEPLOYMENT_TIMEOUT'])
+            poll_initial: First receipt poll interval; doubles up to RECEIPT_POLL_MAX
         Returns:
             str: Deployed contract address
+        Raises:
+            ReceiptTimeout: If the deployment is sent but not mined within timeout
         """
+        if timeout is None:
+            timeout = Config.CONTRACT_CONFIG['DEPLOYMENT_TIMEOUT']
+
         try:
-            with open(contract_path) as f:
-                contract_json = json.load(f)
+            signer = self.local_account(private_key)
+            account = signer.address
+            contract_json = load_contract_artifact(os.path.abspath(contract_path))
             
             contract = self.w3.eth.contract(
                 abi=contract_json['abi'],
                 bytecode=contract_json['bytecode']
             )
             
-            # Estimate gas for deployment
-            gas_estimate = contract.constructor().estimate_gas()
-            gas_price = self.get_gas_price()
+            constructor = contract.constructor()
+
+            # Gas estimate, plus the nonce unless already known locally, in one JSON-RPC
+            # batch; the (usually cached) gas price is looked up alongside it. Both run
+            # in worker threads to keep the event loop free
+            calls = [('eth_estimateGas', [{'from': account, 'data': constructor.data_in_transaction}])]
+            fetch_nonce = account not in self._nonces
+            if fetch_nonce:
+                calls.append(('eth_getTransactionCount', [account, 'pending']))
+
+            batch, gas_price = await asyncio.gather(
+                asyncio.to_thread(self.batch_rpc, calls),
+                asyncio.to_thread(self.get_gas_price)
+            )
+            results = iter(batch)
+            gas_estimate = int(next(results), 16)
+            nonce = self.next_nonce(account, int(next(results), 16) if fetch_nonce else None)
             
-            # Build transaction
-            transaction = contract.constructor().build_transaction({
+            # Build transaction; every field is set, so this makes no RPC calls
+            transaction = constructor.build_transaction({
                 'from': account,
                 'gas': gas_estimate,
                 'gasPrice': gas_price,
-                'nonce': self.w3.eth.get_transaction_count(account)
+                'nonce': nonce,
+                'chainId': self.GANACHE_CONFIG['CHAIN_ID']
             })
             
             # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction,
-                private_key=self.w3.eth.account.from_key(account).key
-            )
+            signed_txn = signer.sign_transaction(transaction)
             
             # Send transaction and wait for receipt
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(
-                tx_hash,
-                timeout=60,
-                poll_latency=0.1
-            )
+            try:
+                # Signing stays in web3; the submit itself is a plain eth_sendRawTransaction
+                tx_hash = await asyncio.to_thread(
+                    self.raw_rpc, 'eth_sendRawTransaction', [Web3.to_hex(signed_txn.rawTransaction)]
+                )
+            except Exception:
+                # A rejected send (e.g. nonce too low/high) leaves the local count unreliable
+                self.reset_nonce(account)
+                raise
+            tx_receipt = await self.wait_for_receipt(tx_hash, timeout=timeout, poll_initial=poll_initial)
             
             if tx_receipt['status'] != 1:
                 raise EthereumError("Contract deployment failed")
             
             return tx_receipt.contractAddress
             
+        except ReceiptTimeout:
+            raise
         except Exception as e:
             self.logger.error(f"Contract deployment failed: {str(e)}")
-            raise EthereumError(f"Contract deployment error: {str(e)}")
\ No newline at end of file
+            raise EthereumError(f"Contract deployment error: {str(e)}")
+
+_eth_handler = None
+_eth_handler_lock = threading.Lock()
+
+def get_eth_handler() -> EthereumHandler:
+    """Return the process-wide EthereumHandler, connecting on first use."""
+    global _eth_handler
+    if _eth_handler is None:
+        with _eth_handler_lock:
+            if _eth_handler is None:
+                _eth_handler = EthereumHandler()
+    return _eth_handler
+
+def prewarm_eth_handler() -> None:
+    """Connect the shared handler before the first request; on failure it connects lazily later."""
+    try:
+        get_eth_handler()
+    except EthereumError as e:
+        logger.warning(f"Ethereum handler not ready at startup: {str(e)}")
@@ -1,96 +1,135 @@
 # backend/utils/ipfs.py
-import ipfshttpclient
-import aiofiles
+import aiohttp
+import hashlib
+import hmac
+import time
+import orjson
 import os
 from fastapi import UploadFile, HTTPException
-from typing import Optional
-import tempfile
+from typing import List, Optional
 import logging
-from pathlib import Path
+from ..config import Config
 
 logger = logging.getLogger(__name__)
 
+ALLOWED_EXTENSIONS = frozenset(('.pdf', '.jpg', '.jpeg', '.png'))
+ALLOWED_CONTENT_TYPES = frozenset(('application/pdf', 'image/jpeg', 'image/png'))
+
 class IPFSManager:
+    # Keep-alive HTTP session for the IPFS API and gateway, created on first use
+    _http_session: Optional[aiohttp.ClientSession] = None
+
     def __init__(self):
-        self.client = None
-        self.connect()
-        self.allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png'}
+        self.api_url = f"{Config.IPFS_CONFIG['API_URL']}/api/v0"
+        self.allowed_extensions = ALLOWED_EXTENSIONS
         self.max_file_size = 50 * 1024 * 1024  # 50MB
-
-    def connect(self):
-        """Establish connection to local IPFS daemon"""
-        try:
-            self.client = ipfshttpclient.connect('/ip4/127.0.0.1/tcp/5001')
-        except Exception as e:
-            logger.error(f"Failed to connect to IPFS: {str(e)}")
-            raise HTTPException(status_code=500, detail="IPFS connection failed")
+        self.chunk_size = 1024 * 1024  # 1MB IPFS chunker blocks
 
     def validate_file(self, file: UploadFile) -> None:
         """Validate file extension and size"""
         # Check extension
-        file_ext = Path(file.filename).suffix.lower()
+        file_ext = os.path.splitext(file.filename)[1].lower()
         if file_ext not in self.allowed_extensions:
             raise HTTPException(
                 status_code=400,
-                detail=f"File type not allowed. Allowed types: {self.allowed_extensions}"
+                detail=f"File type not allowed. Allowed types: {sorted(self.allowed_extensions)}"
             )
 
-    async def add_file(self, file: UploadFile) -> str:
-        """Add file to IPFS and return hash"""
+        if file.content_type and file.content_type not in ALLOWED_CONTENT_TYPES:
+            raise HTTPException(
+                status_code=415,
+                detail=f"Content type not allowed. Allowed types: {sorted(ALLOWED_CONTENT_TYPES)}"
+            )
+
+        # Use the size recorded while the upload was spooled; fall back to seeking
+        file_size = file.size
+        if file_size is None:
+            file.file.seek(0, os.SEEK_END)
+            file_size = file.file.tell()
+            file.file.seek(0)
+        if file_size > self.max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size exceeds maximum limit of {self.max_file_size/1024/1024}MB"
+            )
+
+    async def add_file(self, file: UploadFile, pin: bool = True) -> str:
+        """Stream file to IPFS and return hash; pin=False defers pinning to the caller"""
+        hashes = await self.add_many([file], pin=pin)
+        return hashes[0]
+
+    async def add_many(self, files: List[UploadFile], pin: bool = True) -> List[str]:
+        """Stream several files to IPFS in a single add request and return their hashes in order"""
         try:
-            self.validate_file(file)
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-                # Write uploaded file to temporary file
-                async with aiofiles.open(temp_path, 'wb') as out_file:
-                    content = await file.read()
-                    if len(content) > self.max_file_size:
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"File size exceeds maximum limit of {self.max_file_size/1024/1024}MB"
-                        )
-                    await out_file.write(content)
-
-                # Add to IPFS
-                ipfs_response = self.client.add(temp_path)
-                ipfs_hash = ipfs_response['Hash']
-
-                # Clean up
-                os.unlink(temp_path)
-                
-                return ipfs_hash
+            for file in files:
+                self.validate_file(file)
+
+            # One multipart request for all files; aiohttp streams each spooled file
+            form = aiohttp.FormData()
+            for file in files:
+                form.add_field('file', file.file, filename=file.filename)
 
+            async with self.http_session().post(
+                f"{self.api_url}/add",
+                params={'chunker': f"size-{self.chunk_size}", 'pin': str(pin).lower()},
+                data=form
+            ) as response:
+                response.raise_for_status()
+                # The daemon answers with one JSON object per line, in upload order
+                body = await response.read()
+            return [orjson.loads(line)['Hash'] for line in body.splitlines() if line]
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"IPFS upload failed: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to upload to IPFS: {str(e)}")
 
-    async def get_file(self, ipfs_hash: str) -> Optional[bytes]:
-        """Retrieve file from IPFS by hash"""
-        try:
-            return self.client.cat(ipfs_hash)
-        except Exception as e:
-            logger.error(f"IPFS retrieval failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to retrieve from IPFS: {str(e)}")
+    @classmethod
+    def http_session(cls) -> aiohttp.ClientSession:
+        """Return the shared API/gateway session, opening it on first use"""
+        if cls._http_session is None or cls._http_session.closed:
+            cls._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+            )
+        return cls._http_session
 
     def get_ipfs_url(self, ipfs_hash: str) -> str:
         """Generate IPFS gateway URL for hash"""
         return f"http://localhost:8080/ipfs/{ipfs_hash}"
 
-    async def pin_file(self, ipfs_hash: str) -> None:
-        """Pin file to ensure persistence"""
+    def get_signed_url(self, ipfs_hash: str, user_id: int) -> str:
+        """Generate a short-lived gateway URL signed for one user"""
+        ipfs_config = Config.IPFS_CONFIG
+        expires_at = int(time.time()) + ipfs_config['DOWNLOAD_URL_TTL']
+        signature = hmac.new(
+            ipfs_config['DOWNLOAD_SIGNING_KEY'].encode(),
+            f"{ipfs_hash}:{user_id}:{expires_at}".encode(),
+            hashlib.sha256
+        ).hexdigest()
+        return f"{ipfs_config['DOWNLOAD_GATEWAY']}/{ipfs_hash}?user={user_id}&exp={expires_at}&sig={signature}"
+
+    async def pin_file(self, ipfs_hash: str) -> bool:
+        """
+        Pin file to ensure persistence.
+        Runs as a background task after the response is sent, so failures are logged
+        and swallowed rather than raised (a raise would also skip the tasks queued after it).
+        """
         try:
-            self.client.pin.add(ipfs_hash)
+            async with self.http_session().post(
+                f"{self.api_url}/pin/add",
+                params={'arg': ipfs_hash},
+                timeout=aiohttp.ClientTimeout(total=Config.IPFS_CONFIG['PIN_TIMEOUT'])
+            ) as response:
+                response.raise_for_status()
+            return True
         except Exception as e:
-            logger.error(f"IPFS pinning failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Failed to pin file: {str(e)}")
-
-    def __del__(self):
-        """Cleanup IPFS client connection"""
-        if self.client:
-            try:
-                self.client.close()
-            except:
-                pass
\ No newline at end of file
+            logger.error(f"IPFS pinning failed for {ipfs_hash}: {str(e)}")
+            return False
+
+    @classmethod
+    async def close_http_session(cls):
+        """Close the shared API/gateway session"""
+        if cls._http_session is not None:
+            await cls._http_session.close()
+            cls._http_session = None
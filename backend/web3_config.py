@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import Web3
+from web3.providers.rpc import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+# Kept apart from config.py so that importing the app configuration never
+# pulls in web3 and its crypto stack; Config.get_web3_provider imports this lazily.
+
+RPC_POOL_SIZE = 32
+RPC_TIMEOUT = 10  # seconds
+
+def create_rpc_session() -> requests.Session:
+    """Create a keep-alive HTTP session with a connection pool for JSON-RPC calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=RPC_POOL_SIZE,
+        pool_maxsize=RPC_POOL_SIZE,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+@lru_cache(maxsize=None)
+def shared_rpc_session() -> requests.Session:
+    """Return the process-wide RPC session, so every provider shares one connection pool."""
+    return create_rpc_session()
+
+class PooledHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider that posts every request through one given session.
+    web3's own session cache is keyed by thread, so calls made from worker
+    threads would otherwise each get a fresh, unpooled session.
+    """
+
+    def __init__(self, endpoint_uri: str, session: requests.Session, request_kwargs: Optional[Any] = None):
+        self.session = session
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+def create_web3_provider(provider_uri: str, session: Optional[requests.Session] = None) -> Web3:
+    """Create a Web3 instance backed by a pooled, keep-alive HTTP provider."""
+    return Web3(PooledHTTPProvider(
+        provider_uri,
+        session=session or shared_rpc_session(),
+        request_kwargs={'timeout': RPC_TIMEOUT}
+    ))
@@ -0,0 +1,184 @@
+"""purchase and sales columns
+
+Adds the columns the purchase flow and sales pages rely on, the indexes
+behind them, and stores transaction type/status as their lowercase enum
+values instead of native enums.
+
+Revision ID: 0002_sales_columns
+Revises: 0001_baseline
+Create Date: 2026-10-15 17:49:37.645002
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_sales_columns'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+TRANSACTION_TYPE = sa.Enum('PURCHASE', 'ROYALTY', 'WITHDRAWAL', name='transactiontype')
+TRANSACTION_STATUS = sa.Enum('PENDING', 'COMPLETED', 'FAILED', name='transactionstatus')
+
+
+def upgrade():
+    # Rows written before server defaults existed may lack a timestamp
+    op.execute("UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE books SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute("UPDATE transactions SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True),
+               server_default=sa.func.now(),
+               nullable=False)
+        batch_op.alter_column('updated_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True),
+               server_default=sa.func.now())
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('seller_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('total_sales', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('total_revenue', sa.BigInteger(), server_default='0', nullable=False))
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True),
+               server_default=sa.func.now(),
+               nullable=False)
+        batch_op.alter_column('updated_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True),
+               server_default=sa.func.now())
+        batch_op.create_index('ix_books_author_avail', ['author_id', 'is_available', 'is_deleted'], unique=False)
+        batch_op.create_index(batch_op.f('ix_books_author_id'), ['author_id'], unique=False)
+        batch_op.create_index('ix_books_available_created_id', ['is_available', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_books_created', ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_books_seller_id'), ['seller_id'], unique=False)
+        batch_op.create_foreign_key('fk_books_seller_id_users', 'users', ['seller_id'], ['id'])
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('buyer_address', sa.String(length=42), nullable=True))
+        batch_op.add_column(sa.Column('author_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('royalty_percentage', sa.Integer(), nullable=True))
+        batch_op.alter_column('type',
+               existing_type=TRANSACTION_TYPE,
+               type_=sa.String(length=16),
+               existing_nullable=False,
+               postgresql_using='type::text')
+        batch_op.alter_column('status',
+               existing_type=TRANSACTION_STATUS,
+               type_=sa.String(length=16),
+               existing_nullable=False,
+               postgresql_using='status::text')
+        batch_op.alter_column('timestamp',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True),
+               server_default=sa.func.now(),
+               nullable=False)
+        batch_op.alter_column('completed_at',
+               existing_type=sa.DateTime(),
+               type_=sa.DateTime(timezone=True))
+        batch_op.create_index(batch_op.f('ix_transactions_buyer_id'), ['buyer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transactions_seller_id'), ['seller_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transactions_status'), ['status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transactions_type'), ['type'], unique=False)
+        batch_op.create_index('ix_tx_author_status', ['author_id', 'status'], unique=False)
+        batch_op.create_index('ix_tx_book_buyer_status', ['book_id', 'buyer_address', 'status'], unique=False)
+        batch_op.create_index('ix_tx_book_status', ['book_id', 'status', 'timestamp', 'id'], unique=False)
+        batch_op.create_index('ix_tx_buyer_type', ['buyer_id', 'type'], unique=False)
+        batch_op.create_index('ix_tx_seller_status', ['seller_id', 'status'], unique=False)
+        batch_op.create_foreign_key('fk_transactions_author_id_users', 'users', ['author_id'], ['id'])
+
+    # Native enums stored the member names; the models now store the values
+    op.execute("UPDATE transactions SET type = lower(type), status = lower(status)")
+    # Fill in the sale-time snapshot and the book counters for existing purchases
+    op.execute(
+        "UPDATE transactions SET "
+        "author_id = (SELECT books.author_id FROM books WHERE books.id = transactions.book_id), "
+        "royalty_percentage = (SELECT books.royalty_percentage FROM books WHERE books.id = transactions.book_id) "
+        "WHERE book_id IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE books SET "
+        "total_sales = (SELECT count(*) FROM transactions "
+        "WHERE transactions.book_id = books.id AND transactions.status = 'completed'), "
+        "total_revenue = (SELECT coalesce(sum(transactions.amount), 0) FROM transactions "
+        "WHERE transactions.book_id = books.id AND transactions.status = 'completed')"
+    )
+
+    TRANSACTION_TYPE.drop(op.get_bind(), checkfirst=True)
+    TRANSACTION_STATUS.drop(op.get_bind(), checkfirst=True)
+
+
+def downgrade():
+    TRANSACTION_TYPE.create(op.get_bind(), checkfirst=True)
+    TRANSACTION_STATUS.create(op.get_bind(), checkfirst=True)
+    op.execute("UPDATE transactions SET type = upper(type), status = upper(status)")
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_transactions_author_id_users', type_='foreignkey')
+        batch_op.drop_index('ix_tx_seller_status')
+        batch_op.drop_index('ix_tx_buyer_type')
+        batch_op.drop_index('ix_tx_book_status')
+        batch_op.drop_index('ix_tx_book_buyer_status')
+        batch_op.drop_index('ix_tx_author_status')
+        batch_op.drop_index(batch_op.f('ix_transactions_type'))
+        batch_op.drop_index(batch_op.f('ix_transactions_status'))
+        batch_op.drop_index(batch_op.f('ix_transactions_seller_id'))
+        batch_op.drop_index(batch_op.f('ix_transactions_buyer_id'))
+        batch_op.alter_column('completed_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime())
+        batch_op.alter_column('timestamp',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime(),
+               server_default=None,
+               nullable=True)
+        batch_op.alter_column('status',
+               existing_type=sa.String(length=16),
+               type_=TRANSACTION_STATUS,
+               existing_nullable=False,
+               postgresql_using='status::transactionstatus')
+        batch_op.alter_column('type',
+               existing_type=sa.String(length=16),
+               type_=TRANSACTION_TYPE,
+               existing_nullable=False,
+               postgresql_using='type::transactiontype')
+        batch_op.drop_column('royalty_percentage')
+        batch_op.drop_column('author_id')
+        batch_op.drop_column('buyer_address')
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_books_seller_id_users', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_books_seller_id'))
+        batch_op.drop_index('ix_books_created')
+        batch_op.drop_index('ix_books_available_created_id')
+        batch_op.drop_index(batch_op.f('ix_books_author_id'))
+        batch_op.drop_index('ix_books_author_avail')
+        batch_op.alter_column('updated_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime(),
+               server_default=None)
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime(),
+               server_default=None,
+               nullable=True)
+        batch_op.drop_column('total_revenue')
+        batch_op.drop_column('total_sales')
+        batch_op.drop_column('seller_id')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('updated_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime(),
+               server_default=None)
+        batch_op.alter_column('created_at',
+               existing_type=sa.DateTime(timezone=True),
+               type_=sa.DateTime(),
+               server_default=None,
+               nullable=True)
@@ -0,0 +1,39 @@
+"""keyset pagination indexes on id
+
+The book and sales pagers page on id alone, so their indexes no longer
+need the timestamp column.
+
+Revision ID: 0003_keyset_id_indexes
+Revises: 0002_sales_columns
+Create Date: 2026-10-15 18:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_keyset_id_indexes'
+down_revision = '0002_sales_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index('ix_books_available_created_id')
+        batch_op.create_index('ix_books_available_id', ['is_available', 'id'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_tx_book_status')
+        batch_op.create_index('ix_tx_book_status', ['book_id', 'status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_tx_book_status')
+        batch_op.create_index('ix_tx_book_status', ['book_id', 'status', 'timestamp', 'id'], unique=False)
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index('ix_books_available_id')
+        batch_op.create_index('ix_books_available_created_id', ['is_available', 'created_at', 'id'], unique=False)
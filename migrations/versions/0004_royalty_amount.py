@@ -0,0 +1,49 @@
+"""per-sale royalty amount
+
+Stores each sale's royalty in wei so the royalties report can SUM it
+instead of multiplying amount by percentage in SQL, which overflows
+BIGINT. Existing rows are backfilled in Python for the same reason.
+
+Revision ID: 0004_royalty_amount
+Revises: 0003_keyset_id_indexes
+Create Date: 2026-10-15 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_royalty_amount'
+down_revision = '0003_keyset_id_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('royalty_amount', sa.BigInteger(), nullable=True))
+
+    transactions = sa.table(
+        'transactions',
+        sa.column('id', sa.Integer),
+        sa.column('amount', sa.BigInteger),
+        sa.column('royalty_percentage', sa.Integer),
+        sa.column('royalty_amount', sa.BigInteger)
+    )
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(transactions.c.id, transactions.c.amount, transactions.c.royalty_percentage)
+        .where(transactions.c.royalty_percentage.is_not(None))
+    ).all()
+    for id, amount, royalty_percentage in rows:
+        connection.execute(
+            transactions.update()
+            .where(transactions.c.id == id)
+            .values(royalty_amount=amount * royalty_percentage // 100)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_column('royalty_amount')
@@ -0,0 +1,42 @@
+"""unbounded wei total_revenue
+
+BIGINT overflows once a book has earned about 9.22 ETH. Widen
+books.total_revenue to NUMERIC(78, 0). SQLite has no exact wider type,
+so the column stays INTEGER there (see backend.database.Wei).
+
+Revision ID: 0005_wei_total_revenue
+Revises: 0004_royalty_amount
+Create Date: 2026-10-15 19:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_wei_total_revenue'
+down_revision = '0004_royalty_amount'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.alter_column('total_revenue',
+               existing_type=sa.BigInteger(),
+               type_=sa.Numeric(precision=78, scale=0),
+               existing_nullable=False,
+               existing_server_default=sa.text('0'))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        return
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.alter_column('total_revenue',
+               existing_type=sa.Numeric(precision=78, scale=0),
+               type_=sa.BigInteger(),
+               existing_nullable=False,
+               existing_server_default=sa.text('0'))
@@ -0,0 +1,32 @@
+"""user role column
+
+The auth routes and book permissions work with reader/author/seller
+roles, which is_author alone can't express. Existing authors are
+backfilled from is_author.
+
+Revision ID: 0006_user_role
+Revises: 0005_wei_total_revenue
+Create Date: 2026-10-15 20:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_user_role'
+down_revision = '0005_wei_total_revenue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('role', sa.String(length=20), server_default='reader', nullable=False))
+
+    op.execute(sa.text("UPDATE users SET role = 'author' WHERE is_author = :yes").bindparams(yes=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('role')
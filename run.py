@@ -1,9 +1,20 @@
 import os
-from backend import create_app
+import uvicorn
+from backend.api import create_api
 from backend.config import Config
 
-app = create_app(Config)
+app = create_api(Config)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+    # Workers re-import this module, so the app is passed by import string.
+    # uvloop and the httptools parser come with uvicorn[standard]
+    uvicorn.run(
+        'run:app',
+        host='0.0.0.0',
+        port=port,
+        workers=workers,
+        loop='uvloop',
+        http='httptools'
+    )
@@ -52,13 +52,13 @@ function compileContract(contractName) {
     // Extract compiled contract
     const contract = output.contracts[contractName][contractName];
 
-    // Write the bytecode and ABI to files
+    // Write the bytecode and ABI to files. The backend parses this artifact at
+    // startup, so only what it reads is kept (deployedBytecode and the metadata
+    // blob are most of solc's output and nothing uses them)
     const buildArtifact = {
         contractName: contractName,
         abi: contract.abi,
         bytecode: contract.evm.bytecode.object,
-        deployedBytecode: contract.evm.deployedBytecode.object,
-        metadata: contract.metadata,
         compiler: {
             name: 'solc',
             version: solc.version(),
@@ -68,7 +68,7 @@ function compileContract(contractName) {
 
     fs.writeFileSync(
         path.resolve(buildPath, `${contractName}.json`),
-        JSON.stringify(buildArtifact, null, 2)
+        JSON.stringify(buildArtifact)
     );
 
     console.log(`${contractName} contract compiled successfully!`);
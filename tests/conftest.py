@@ -0,0 +1,107 @@
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import create_app
+from backend.config import TestingConfig
+from backend.database import db
+from backend.models import Book, Transaction, User
+from backend.routes import book_routes
+from backend.utils.auth import token_cache, user_cache
+
+@pytest.fixture
+def config(tmp_path):
+    """TestingConfig pointed at a throwaway SQLite file shared by the Flask and async engines."""
+    class Config(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'check_same_thread': False}}
+    return Config
+
+@pytest.fixture
+def app(config):
+    app = create_app(config)
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def api(app, config, monkeypatch):
+    # No Ganache in tests; routes get a fake handler through dependency overrides
+    monkeypatch.setattr('backend.utils.eth.prewarm_eth_handler', lambda: None)
+    from backend.api import create_api
+    return create_api(config)
+
+@pytest.fixture
+def client(api):
+    with TestClient(api) as client:
+        yield client
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    book_routes._book_cache._local.clear()
+    book_routes._book_list_cache._local.clear()
+    token_cache.clear()
+    user_cache.clear()
+
+@pytest.fixture
+def author(app):
+    user = User('author', 'author@example.com', 'password', '0x' + '11' * 20, role='author')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def buyer(app):
+    user = User('buyer', 'buyer@example.com', 'password', '0x' + '22' * 20)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def seller(app):
+    user = User('seller', 'seller@example.com', 'password', '0x' + '44' * 20, role='seller')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+_ids = itertools.count(1)
+
+@pytest.fixture
+def make_book(author):
+    """Create a book row; timestamps come from the database defaults."""
+    def make_book(**fields):
+        n = next(_ids)
+        book = Book(
+            title=fields.pop('title', f'Book {n}'),
+            price=fields.pop('price', 10**18),
+            royalty_percentage=fields.pop('royalty_percentage', 10),
+            ipfs_hash=fields.pop('ipfs_hash', f'QmBook{n}'),
+            blockchain_id=fields.pop('blockchain_id', n),
+            author_id=author.id
+        )
+        for key, value in fields.items():
+            setattr(book, key, value)
+        db.session.add(book)
+        db.session.commit()
+        return book
+    return make_book
+
+@pytest.fixture
+def make_transaction(author):
+    def make_transaction(book, **fields):
+        n = next(_ids)
+        transaction = Transaction(
+            transaction_hash=fields.pop('transaction_hash', f'0x{n:064x}'),
+            seller_id=author.id,
+            amount=fields.pop('amount', book.price),
+            book_id=book.id,
+            author_id=book.author_id,
+            royalty_percentage=book.royalty_percentage,
+            **fields
+        )
+        db.session.add(transaction)
+        db.session.commit()
+        return transaction
+    return make_transaction
@@ -0,0 +1,16 @@
+from backend.api import create_api
+from backend.config import Config
+
+def test_create_api_builds_with_the_default_config():
+    # Importing the routers used to fail on a missing schemas module
+    api = create_api(Config)
+    assert api.state.async_session is not None
+
+def test_async_engine_uses_the_app_config(api, config):
+    engine = api.state.async_session.kw['bind']
+    assert engine.url.database == config.SQLALCHEMY_DATABASE_URI.removeprefix('sqlite:///')
+
+def test_flask_routes_are_mounted(client):
+    response = client.post('/api/auth/register', json={})
+    assert response.status_code == 400
+    assert response.json() == {'message': 'Missing required fields'}
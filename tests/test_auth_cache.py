@@ -0,0 +1,53 @@
+import time
+
+import jwt
+from sqlalchemy import event
+
+from backend.database import db
+from backend.routes.auth_routes import load_user
+from backend.utils import auth
+from backend.utils.auth import JWT_SECRET, decode_token, token_cache, user_cache
+from backend.utils.cache import TTLCache
+
+def make_token(**claims):
+    return jwt.encode({'user_id': 1, **claims}, JWT_SECRET, algorithm='HS256')
+
+def test_decode_token_is_cached(monkeypatch):
+    token = make_token()
+    assert decode_token(token)['user_id'] == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError('token decoded twice')
+    monkeypatch.setattr(auth.jwt, 'decode', fail)
+    assert decode_token(token)['user_id'] == 1
+
+def test_cached_token_never_outlives_its_expiry(monkeypatch):
+    token = make_token(exp=int(time.time()) + 2)
+    decode_token(token)
+    (_, expires_at), = token_cache._entries.values()
+    assert expires_at <= time.monotonic() + 2
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = TTLCache(ttl=10, maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)  # evicts the oldest entry
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    now[0] += 10
+    assert cache.get('b') is None
+
+def test_load_user_serves_repeat_lookups_from_cache(author):
+    assert load_user(author.id).id == author.id
+    assert user_cache.get(author.id) is not None
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        assert load_user(author.id).username == 'author'
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements == []
@@ -0,0 +1,40 @@
+from backend.database import db
+from backend.models import User
+from backend.utils.auth import decode_token
+
+ADDRESS = '0x' + '33' * 20
+
+def register(client, **fields):
+    return client.post('/api/auth/register', json={
+        'username': 'reader',
+        'email': 'reader@example.com',
+        'password': 'password',
+        'eth_address': ADDRESS,
+        **fields
+    })
+
+def test_register_stores_address_and_role(client):
+    response = register(client, role='seller')
+    assert response.status_code == 201
+
+    user = db.session.get(User, response.json()['user_id'])
+    assert (user.ethereum_address, user.role, user.is_author) == (ADDRESS, 'seller', False)
+
+def test_register_rejects_unknown_role(client):
+    assert register(client, role='admin').status_code == 400
+
+def test_login_returns_token_and_profile(client, author):
+    response = client.post('/api/auth/login', json={'email': 'author@example.com', 'password': 'password'})
+    assert response.status_code == 200
+    body = response.json()
+    assert body['user']['eth_address'] == author.ethereum_address
+    assert body['user']['role'] == 'author'
+    assert decode_token(body['token'])['user_id'] == author.id
+
+    profile = client.get('/api/auth/profile', headers={'Authorization': f"Bearer {body['token']}"})
+    assert profile.status_code == 200
+    assert profile.json()['user']['eth_address'] == author.ethereum_address
+
+def test_login_rejects_wrong_password(client, author):
+    response = client.post('/api/auth/login', json={'email': 'author@example.com', 'password': 'wrong'})
+    assert response.status_code == 401
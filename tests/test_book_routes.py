@@ -0,0 +1,143 @@
+import asyncio
+
+import jwt
+import pytest
+
+from backend.database import db
+from backend.models import Book
+from backend.routes import book_routes
+from backend.routes.book_routes import book_payload
+from backend.utils.auth import JWT_SECRET, get_current_user
+from backend.utils.cache import SharedCache
+
+@pytest.fixture
+def login(api):
+    def login(user):
+        api.dependency_overrides[get_current_user] = lambda: user
+    yield login
+    api.dependency_overrides.clear()
+
+def bearer(user):
+    """Headers carrying a real token, so get_current_user loads the user from the database."""
+    return {'Authorization': f"Bearer {jwt.encode({'user_id': user.id}, JWT_SECRET)}"}
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Stub the IPFS node: uploads get fixed CIDs and pins are recorded."""
+    pinned = []
+    async def add_many(files, pin=True):
+        return ['QmPdf', 'QmCover']
+    async def pin_file(ipfs_hash):
+        pinned.append(ipfs_hash)
+    monkeypatch.setattr(book_routes.ipfs, 'add_many', add_many)
+    monkeypatch.setattr(book_routes.ipfs, 'pin_file', pin_file)
+    return pinned
+
+def create_book(client, user, **form):
+    return client.post(
+        '/api/books/',
+        headers=bearer(user),
+        data={'title': 'New', 'description': 'd', 'price': 10**18, 'royalty_percentage': 10,
+              'blockchain_id': 99, **form},
+        files={'pdf_file': ('book.pdf', b'%PDF-1.4', 'application/pdf'),
+               'cover_file': ('cover.png', b'png', 'image/png')}
+    )
+
+def follow_pages(client, url, **params):
+    """Collect ids by following the after_id cursor, failing if a page repeats."""
+    seen, cursor = [], {}
+    for _ in range(20):
+        page = client.get(url, params={**params, **cursor}).json()
+        if isinstance(page, dict):
+            page = page['transactions']
+        if not page:
+            return seen
+        assert page[0]['id'] not in seen
+        seen += [row['id'] for row in page]
+        cursor = {'after_id': page[-1]['id']}
+    raise AssertionError('pagination did not terminate')
+
+def test_book_list_pages_by_keyset_without_gaps(client, make_book):
+    # Database-set created_at values, as in production
+    books = [make_book() for _ in range(3)]
+    make_book(is_available=False)
+
+    seen = follow_pages(client, '/api/books/', limit=1)
+    assert seen == [book.id for book in reversed(books)]
+
+def test_book_sales_page_through_transactions(client, make_book, make_transaction, login, author):
+    book = make_book()
+    transactions = [make_transaction(book, status='completed') for _ in range(3)]
+    login(author)
+
+    seen = follow_pages(client, f'/api/books/{book.id}/sales', include_transactions=True, limit=1)
+    assert seen == [transaction.id for transaction in reversed(transactions)]
+
+def test_book_detail_is_served_from_cache_until_invalidated(client, make_book, login, author):
+    book = make_book(title='Before')
+    assert client.get(f'/api/books/{book.id}').json()['title'] == 'Before'
+
+    # A direct write is not seen until the cache is invalidated
+    book.title = 'After'
+    db.session.commit()
+    assert client.get(f'/api/books/{book.id}').json()['title'] == 'Before'
+
+    login(author)
+    response = client.put(f'/api/books/{book.id}/status', params={'is_available': False})
+    assert response.status_code == 200
+    body = client.get(f'/api/books/{book.id}').json()
+    assert body['title'] == 'After'
+    assert body['is_available'] is False
+
+def test_download_returns_signed_url_for_the_book_file(client, make_book, make_transaction, login, buyer):
+    book = make_book(ipfs_hash='QmDownload')
+    make_transaction(book, buyer_address=buyer.ethereum_address, status='completed')
+    login(buyer)
+
+    response = client.get(f'/api/books/{book.id}/download')
+    assert response.status_code == 200
+    assert '/QmDownload?' in response.json()['download_url']
+
+def test_download_requires_a_completed_purchase(client, make_book, make_transaction, login, buyer):
+    book = make_book()
+    make_transaction(book, buyer_address=buyer.ethereum_address, status='pending')
+    login(buyer)
+    assert client.get(f'/api/books/{book.id}/download').status_code == 403
+
+def test_book_sales_royalties_use_integer_wei(client, make_book, login, author):
+    # 10**18 + 1 wei is not representable exactly as a float
+    book = make_book(royalty_percentage=7, total_sales=1, total_revenue=10**18 + 1)
+    login(author)
+    sales = client.get(f'/api/books/{book.id}/sales').json()
+    assert sales['total_royalties'] == str((10**18 + 1) * 7 // 100)
+
+def test_cached_book_payload_carries_revenue_past_64_bits():
+    # orjson rejects ints above 2**64, so the cached payload holds wei as a string
+    book = Book('Bestseller', 10**18, 10, 'QmBestseller', 1, author_id=1)
+    book.id, book.is_available, book.total_sales, book.total_revenue = 1, True, 1200, 2**70
+    cache = SharedCache('test', 60)
+    asyncio.run(cache.set(book.id, book_payload(book)))
+    assert asyncio.run(cache.get(book.id))['total_revenue'] == str(2**70)
+
+def test_author_creates_and_lists_own_books(client, uploads, author):
+    response = create_book(client, author)
+    assert response.status_code == 200
+    book = response.json()
+    assert (book['author_id'], book['seller_id'], book['ipfs_hash']) == (author.id, None, 'QmPdf')
+    assert uploads == ['QmPdf', 'QmCover']
+
+    books = client.get('/api/author/books/', headers=bearer(author)).json()
+    assert [row['id'] for row in books] == [book['id']]
+
+def test_seller_lists_an_authors_book(client, uploads, author, seller):
+    assert create_book(client, seller).status_code == 400
+    book = create_book(client, seller, author_id=author.id).json()
+    assert (book['author_id'], book['seller_id']) == (author.id, seller.id)
+
+    books = client.get('/api/seller/books/', headers=bearer(seller)).json()
+    assert [row['id'] for row in books] == [book['id']]
+    assert client.get('/api/author/books/', headers=bearer(seller)).status_code == 403
+
+def test_readers_cannot_list_books(client, uploads, buyer):
+    assert create_book(client, buyer).status_code == 403
+    assert client.get('/api/seller/books/', headers=bearer(buyer)).status_code == 403
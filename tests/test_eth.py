@@ -0,0 +1,186 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+
+from backend.utils import eth as eth_module
+from backend.utils.eth import EthereumError, EthereumHandler, ReceiptTimeout, verify_eth_signature, verify_web3
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+class FakeSession:
+    """Answers JSON-RPC batches from a method -> result map, replying in reverse order."""
+
+    def __init__(self, results):
+        self.results = results
+        self.requests = []
+
+    def post(self, url, json, timeout):
+        self.requests.append(json)
+        replies = []
+        for call in json:
+            result = self.results[call['method']]
+            if isinstance(result, Exception):
+                replies.append({'id': call['id'], 'error': {'message': str(result)}})
+            else:
+                replies.append({'id': call['id'], 'result': result})
+        return FakeResponse(replies[::-1])
+
+def make_handler(session=None, **eth):
+    """An EthereumHandler wired to fakes, skipping the node checks in __init__."""
+    handler = EthereumHandler.__new__(EthereumHandler)
+    handler.rpc_session = session
+    handler.w3 = SimpleNamespace(
+        provider=SimpleNamespace(endpoint_uri='http://node'),
+        eth=SimpleNamespace(**eth)
+    )
+    handler.logger = eth_module.logger
+    handler._gas_expires_ns = 0
+    handler._gas_refreshing = False
+    handler._gas_lock = threading.Lock()
+    handler._gas_price = EthereumHandler.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+    handler._nonces = {}
+    handler._nonce_lock = threading.Lock()
+    handler._accounts = {}
+    return handler
+
+def test_batch_rpc_sends_one_request_and_keeps_call_order():
+    session = FakeSession({'net_version': '5777', 'eth_chainId': '0x539'})
+    handler = make_handler(session)
+    assert handler.batch_rpc([('net_version', []), ('eth_chainId', [])]) == ['5777', '0x539']
+    assert len(session.requests) == 1
+
+def test_batch_rpc_raises_on_error_reply():
+    handler = make_handler(FakeSession({'eth_gasPrice': ValueError('boom')}))
+    with pytest.raises(EthereumError, match='eth_gasPrice'):
+        handler.raw_rpc('eth_gasPrice', [])
+
+def test_next_nonce_reads_the_chain_once_then_counts_locally():
+    calls = []
+    handler = make_handler(get_transaction_count=lambda address, block: calls.append(address) or 5)
+    assert [handler.next_nonce('0xA') for _ in range(3)] == [5, 6, 7]
+    assert calls == ['0xA']
+
+    handler.reset_nonce('0xA')
+    assert handler.next_nonce('0xA') == 5
+    assert handler.next_nonce('0xB', chain_nonce=9) == 9
+    assert calls == ['0xA', '0xA']
+
+def test_gas_price_refresh_runs_once_for_concurrent_lookups(monkeypatch):
+    handler = make_handler()
+    handler._gas_expires_ns = 1  # fetched once, now expired
+    started, release = threading.Event(), threading.Event()
+    refreshes = []
+
+    def refresh():
+        refreshes.append(1)
+        started.set()
+        release.wait(5)
+        with handler._gas_lock:
+            handler._gas_refreshing = False
+    monkeypatch.setattr(handler, '_refresh_gas_price', refresh)
+
+    lookups = [threading.Thread(target=handler.get_gas_price) for _ in range(8)]
+    for lookup in lookups:
+        lookup.start()
+    for lookup in lookups:
+        lookup.join()
+    started.wait(5)
+    release.set()
+    assert refreshes == [1]
+
+def test_failed_gas_refresh_backs_off():
+    class NodeDown:
+        @property
+        def gas_price(self):
+            raise ConnectionError('node down')
+    handler = make_handler()
+    handler.w3.eth = NodeDown()
+    handler._gas_refreshing = True
+
+    assert handler._refresh_gas_price() == EthereumHandler.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+    assert not handler._gas_refreshing
+    # Served from cache until the retry interval passes, so no new thread per lookup
+    assert handler.get_gas_price() == EthereumHandler.GANACHE_CONFIG['DEFAULT_GAS_PRICE']
+    assert not handler._gas_refreshing
+
+def test_deploy_contract_takes_the_gas_price_from_get_gas_price(tmp_path, monkeypatch):
+    artifact = tmp_path / 'Empty.json'
+    artifact.write_bytes(orjson.dumps({'abi': [], 'bytecode': '0x6080'}))
+    session = FakeSession({
+        'eth_estimateGas': hex(50000),
+        'eth_getTransactionCount': '0x4',
+        'eth_sendRawTransaction': '0x' + 'cd' * 32
+    })
+    handler = make_handler(session, contract=Web3().eth.contract)
+    handler._cache_gas_price(30 * 10**9)
+
+    signed = []
+    signer = SimpleNamespace(
+        address=Account.create().address,
+        sign_transaction=lambda tx: signed.append(tx) or SimpleNamespace(rawTransaction=b'\x01')
+    )
+    monkeypatch.setattr(handler, 'local_account', lambda key: signer)
+    async def wait_for_receipt(tx_hash, timeout, poll_initial):
+        return AttributeDict({'status': 1, 'contractAddress': '0xC0'})
+    monkeypatch.setattr(handler, 'wait_for_receipt', wait_for_receipt)
+
+    assert asyncio.run(handler.deploy_contract('key', str(artifact))) == '0xC0'
+    assert (signed[0]['gasPrice'], signed[0]['gas'], signed[0]['nonce']) == (30 * 10**9, 50000, 4)
+    assert all(call['method'] != 'eth_gasPrice' for batch in session.requests for call in batch)
+
+def test_wait_for_receipt_backs_off_until_mined(monkeypatch):
+    attempts = []
+    def get_receipt(tx_hash):
+        attempts.append(tx_hash)
+        if len(attempts) < 7:
+            raise TransactionNotFound(tx_hash)
+        return {'status': 1}
+    sleeps = []
+    async def sleep(delay):
+        sleeps.append(delay)
+    monkeypatch.setattr(eth_module.asyncio, 'sleep', sleep)
+
+    handler = make_handler(get_transaction_receipt=get_receipt)
+    assert asyncio.run(handler.wait_for_receipt('0xabc', timeout=60)) == {'status': 1}
+    assert sleeps == [0.1, 0.2, 0.4, 0.8, 1.6, 2.0]
+
+@pytest.mark.parametrize('tx_hash', ['0x' + 'ab' * 32, bytes.fromhex('ab' * 32)])
+def test_wait_for_receipt_times_out_with_readable_hash(tx_hash):
+    def get_receipt(tx_hash):
+        raise TransactionNotFound(tx_hash)
+    handler = make_handler(get_transaction_receipt=get_receipt)
+    with pytest.raises(ReceiptTimeout, match='0x' + 'ab' * 32):
+        asyncio.run(handler.wait_for_receipt(tx_hash, timeout=0.05, poll_initial=0.01))
+
+def test_verify_eth_signature():
+    account = Account.create()
+    signature = account.sign_message(encode_defunct(text='hello')).signature.hex()
+    assert verify_eth_signature('hello', signature, account.address)
+    assert not verify_eth_signature('goodbye', signature, account.address)
+    assert not verify_eth_signature('hello', signature, Account.create().address)
+    assert not verify_eth_signature('hello', '0x1234', account.address)
+
+@pytest.mark.parametrize('connected, network_id, ok', [(True, '5777', True), (True, '1', False), (False, '5777', False)])
+def test_verify_web3_checks_connection_and_network(connected, network_id, ok):
+    provider = SimpleNamespace(is_connected=lambda: connected, net=SimpleNamespace(version=network_id))
+    app = SimpleNamespace(config={
+        'WEB3_PROVIDER_FACTORY': lambda: provider,
+        'GANACHE_CONFIG': {'NETWORK_ID': '5777'}
+    })
+    assert verify_web3(app) is ok
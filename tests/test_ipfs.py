@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import hmac
+import io
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from backend.config import Config
+from backend.utils.ipfs import IPFSManager
+
+def upload(filename, content_type, size=None, data=b'%PDF-1.4'):
+    return UploadFile(
+        file=io.BytesIO(data),
+        filename=filename,
+        size=size,
+        headers=Headers({'content-type': content_type})
+    )
+
+def test_validate_file_accepts_allowed_upload():
+    IPFSManager().validate_file(upload('book.pdf', 'application/pdf', size=1024))
+
+@pytest.mark.parametrize('file, status', [
+    (upload('book.exe', 'application/pdf'), 400),
+    (upload('book.pdf', 'application/x-msdownload'), 415),
+    (upload('book.pdf', 'application/pdf', size=51 * 1024 * 1024), 413),
+])
+def test_validate_file_rejects(file, status):
+    with pytest.raises(HTTPException) as error:
+        IPFSManager().validate_file(file)
+    assert error.value.status_code == status
+
+def test_validate_file_measures_size_when_not_recorded():
+    ipfs = IPFSManager()
+    ipfs.max_file_size = 4
+    file = upload('book.pdf', 'application/pdf', data=b'12345')
+    with pytest.raises(HTTPException) as error:
+        ipfs.validate_file(file)
+    assert error.value.status_code == 413
+    assert file.file.tell() == 0
+
+def test_signed_url_verifies_with_the_signing_key():
+    url = urlsplit(IPFSManager().get_signed_url('QmHash', user_id=42))
+    query = {key: values[0] for key, values in parse_qs(url.query).items()}
+    assert url.path.endswith('/QmHash')
+    assert query['user'] == '42'
+
+    expected = hmac.new(
+        Config.IPFS_CONFIG['DOWNLOAD_SIGNING_KEY'].encode(),
+        f"QmHash:42:{query['exp']}".encode(),
+        hashlib.sha256
+    ).hexdigest()
+    assert hmac.compare_digest(query['sig'], expected)
+
+def test_failed_pin_is_logged_not_raised(monkeypatch):
+    class NodeDown:
+        def post(self, *args, **kwargs):
+            raise ConnectionError('node down')
+    monkeypatch.setattr(IPFSManager, 'http_session', classmethod(lambda cls: NodeDown()))
+    # A raise here would stop the background tasks queued after this pin
+    assert asyncio.run(IPFSManager().pin_file('QmHash')) is False
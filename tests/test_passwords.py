@@ -0,0 +1,20 @@
+from werkzeug.security import generate_password_hash
+
+from backend.models import User
+
+def test_new_passwords_use_argon2(app):
+    user = User('reader', 'reader@example.com', 'secret')
+    assert user.password_hash.startswith('$argon2id$')
+    assert user.check_password('secret')
+    assert not user.check_password('wrong')
+
+def test_legacy_pbkdf2_hashes_still_verify(app):
+    user = User('legacy', 'legacy@example.com', 'unused')
+    user.password_hash = generate_password_hash('secret', method='pbkdf2:sha256')
+    assert user.check_password('secret')
+    assert not user.check_password('wrong')
+
+def test_corrupt_argon2_hash_fails_closed(app):
+    user = User('broken', 'broken@example.com', 'unused')
+    user.password_hash = '$argon2id$not-a-hash'
+    assert not user.check_password('unused')
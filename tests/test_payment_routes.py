@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from backend.database import db
+from backend.models import Book, Transaction
+from backend.utils.eth import get_eth_handler
+
+TX_HASH = '0x' + 'ab' * 32
+
+class FakeEth:
+    """Stands in for EthereumHandler: purchaseBook().transact returns TX_HASH, receipts come from a dict."""
+
+    def __init__(self):
+        self.receipts = {}
+        self.contract = SimpleNamespace(functions=SimpleNamespace(
+            purchaseBook=lambda book_id: SimpleNamespace(transact=lambda tx: bytes.fromhex(TX_HASH[2:]))
+        ))
+        self.w3 = SimpleNamespace(eth=SimpleNamespace(get_transaction_receipt=self.get_receipt))
+
+    def get_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+    async def wait_for_receipt(self, tx_hash, timeout, poll_initial=0.1):
+        return self.get_receipt(tx_hash)
+
+@pytest.fixture
+def eth(api):
+    eth = FakeEth()
+    api.dependency_overrides[get_eth_handler] = lambda: eth
+    yield eth
+    api.dependency_overrides.clear()
+
+def purchase(client, book, buyer):
+    return client.post(f'/api/payments/purchase/{book.id}', params={'buyer_address': buyer.ethereum_address})
+
+def test_purchase_settles_once_the_receipt_arrives(client, eth, make_book, buyer):
+    book = make_book(price=5 * 10**17)
+    eth.receipts[TX_HASH] = {'status': 1, 'gasUsed': 21000, 'blockNumber': 7}
+
+    response = purchase(client, book, buyer)
+    assert response.status_code == 200
+    assert response.json()['tx_hash'] == TX_HASH
+
+    # TestClient runs background tasks before returning
+    db.session.expire_all()
+    transaction = db.session.get(Transaction, response.json()['transaction_id'])
+    assert (transaction.status, transaction.block_number) == ('completed', 7)
+    assert db.session.get(Book, book.id).total_revenue == 5 * 10**17
+
+def test_unmined_purchase_stays_pending_and_reconciles_later(client, eth, make_book, buyer):
+    book = make_book()
+    assert purchase(client, book, buyer).status_code == 200
+
+    status = client.get(f'/api/payments/transaction/{TX_HASH}').json()
+    assert status['status'] == 'pending'
+    assert status['transaction']['status'] == 'pending'
+
+    eth.receipts[TX_HASH] = {'status': 1, 'gasUsed': 21000, 'blockNumber': 9}
+    status = client.get(f'/api/payments/transaction/{TX_HASH}').json()
+    assert status['status'] == 'confirmed'
+    assert status['transaction']['status'] == 'completed'
+
+    # Settling again must not count the sale twice
+    client.get(f'/api/payments/transaction/{TX_HASH}')
+    db.session.expire_all()
+    assert db.session.get(Book, book.id).total_sales == 1
+
+def test_reverted_purchase_is_marked_failed(client, eth, make_book, buyer):
+    book = make_book()
+    eth.receipts[TX_HASH] = {'status': 0, 'gasUsed': 21000, 'blockNumber': 3}
+    transaction_id = purchase(client, book, buyer).json()['transaction_id']
+
+    db.session.expire_all()
+    assert db.session.get(Transaction, transaction_id).status == 'failed'
+    assert db.session.get(Book, book.id).total_sales == 0
+
+def test_unknown_transaction_is_404(client, eth):
+    assert client.get(f'/api/payments/transaction/{TX_HASH}').status_code == 404
+
+def test_author_royalties_use_integer_wei(client, make_book, make_transaction, author):
+    book = make_book(royalty_percentage=7)
+    amounts = [10**18 + 1, 3 * 10**18 + 7]
+    for amount in amounts:
+        make_transaction(book, amount=amount, status='completed')
+    make_transaction(book, amount=10**18, status='pending')
+
+    royalties = client.get(f'/api/payments/royalties/{author.id}').json()
+    assert royalties == {
+        'total_royalties': str(sum(amount * 7 // 100 for amount in amounts)),
+        'transaction_count': 2,
+        'books_sold': 1
+    }
+
+def test_author_royalties_do_not_overflow_bigint(client, make_book, make_transaction, author):
+    # amount * percentage passes 2**63 here; the royalty is computed per sale in Python
+    book = make_book(royalty_percentage=50)
+    make_transaction(book, amount=9 * 10**18 + 123456789, status='completed')
+
+    royalties = client.get(f'/api/payments/royalties/{author.id}').json()
+    assert royalties['total_royalties'] == '4500000000061728394'